@@ -0,0 +1,54 @@
+"""Size, write time and load time of block/INSERT DXFs against per-piece geometry.
+
+Run from the repository root: python benchmarks/dxf_blocks.py
+"""
+import io
+import sys
+import timeit
+import zipfile
+from pathlib import Path
+
+import ezdxf
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pattern_generator import (  # noqa: E402
+    MARKER_QUANTITIES, build_patterns, create_graded_nest_zip, generate_graded_block_dxf,
+    generate_marker_block_dxf, generate_marker_dxf, make_marker, sample_measurements,
+)
+
+REPEATS = 10
+# Shirts nested together in the large marker
+SHIRTS = 20
+
+
+def _report(label, write, read_all):
+    files = write()
+    write_ms = timeit.timeit(write, number=REPEATS) / REPEATS * 1e3
+    load_ms = timeit.timeit(lambda: read_all(files), number=REPEATS) / REPEATS * 1e3
+    print(f"{label:<24} write {write_ms:8.2f} ms  load {load_ms:8.2f} ms  "
+          f"size {sum(len(text) for text in files) / 1024:8.1f} KiB")
+
+
+def _read_texts(files):
+    return [ezdxf.read(io.StringIO(text)) for text in files]
+
+
+def _graded_zip_texts():
+    with zipfile.ZipFile(create_graded_nest_zip(sample_measurements)) as zip_file:
+        return [zip_file.read(name).decode("utf-8") for name in zip_file.namelist()]
+
+
+def main():
+    _report("graded, one DXF/piece", _graded_zip_texts, _read_texts)
+    _report("graded, blocks", lambda: [generate_graded_block_dxf(sample_measurements)], _read_texts)
+
+    quantities = {name: count * SHIRTS for name, count in MARKER_QUANTITIES.items()}
+    marker = make_marker(build_patterns(sample_measurements), fabric_width=150, quantities=quantities)
+    print(f"marker: {len(marker['placements'])} pieces")
+    _report("marker, polylines", lambda: [generate_marker_dxf(marker)], _read_texts)
+    _report("marker, blocks", lambda: [generate_marker_block_dxf(marker)], _read_texts)
+
+
+if __name__ == "__main__":
+    main()
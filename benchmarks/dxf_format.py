@@ -0,0 +1,66 @@
+"""Size, write time and load time of ASCII against binary DXF.
+
+Covers single pieces and the graded nests, the largest files we export.
+Run from the repository root: python benchmarks/dxf_format.py
+"""
+import io
+import os
+import sys
+import tempfile
+import timeit
+import zipfile
+from pathlib import Path
+
+import ezdxf
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pattern_generator import (  # noqa: E402
+    DXF_FORMATS, build_patterns, generate_dxf_from_points, generate_graded_nest, generate_graded_nest_dxf,
+    sample_measurements,
+)
+from pattern_generator.dxf_export import _export_job  # noqa: E402
+
+REPEATS = 20
+
+
+def _deflated_size(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for i, data in enumerate(files):
+            zip_file.writestr(f"{i}.dxf", data)
+    return buffer.tell()
+
+
+def _load_ms(files):
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i, data in enumerate(files):
+            paths.append(os.path.join(directory, f"{i}.dxf"))
+            with open(paths[-1], "wb") as f:
+                f.write(data.encode("utf-8") if isinstance(data, str) else data)
+        seconds = timeit.timeit(lambda: [ezdxf.readfile(path) for path in paths], number=REPEATS)
+    return seconds / REPEATS * 1e3
+
+
+def _report(label, write):
+    for fmt in DXF_FORMATS:
+        files = write(fmt)
+        write_ms = timeit.timeit(lambda: write(fmt), number=REPEATS) / REPEATS * 1e3
+        size = sum(len(data) for data in files)
+        print(f"{label:<8} {fmt}  write {write_ms:7.2f} ms  load {_load_ms(files):7.2f} ms  "
+              f"raw {size / 1024:8.1f} KiB  deflated {_deflated_size(files) / 1024:7.1f} KiB")
+
+
+def main():
+    jobs = [_export_job(pattern) for pattern in build_patterns(sample_measurements)]
+    _report("pieces", lambda fmt: [generate_dxf_from_points(points, filename, fmt=fmt, **options)
+                                   for points, filename, options in jobs])
+
+    sizes, nest = generate_graded_nest(sample_measurements)
+    _report("graded", lambda fmt: [generate_graded_nest_dxf(name, sizes, piece["outlines"], fmt)
+                                   for name, piece in nest.items()])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Per-piece DXF export time with and without the reusable template document.
+
+Run from the repository root: python benchmarks/dxf_template.py
+"""
+import io
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pattern_generator import build_patterns, build_dxf_document, sample_measurements, write_dxf  # noqa: E402
+from pattern_generator.dxf_export import _export_job  # noqa: E402
+
+REPEATS = 200
+
+
+def main():
+    jobs = [_export_job(pattern) for pattern in build_patterns(sample_measurements)]
+
+    def fresh():
+        for points, filename, options in jobs:
+            build_dxf_document(points, filename, **options).write(io.StringIO())
+
+    def template():
+        for points, filename, options in jobs:
+            write_dxf(points, filename, io.StringIO(), **options)
+
+    template()  # build the template outside the timing
+    pieces = REPEATS * len(jobs)
+    fresh_ms = timeit.timeit(fresh, number=REPEATS) / pieces * 1e3
+    template_ms = timeit.timeit(template, number=REPEATS) / pieces * 1e3
+    print(f"new document per piece: {fresh_ms:.3f} ms/piece")
+    print(f"reused template:        {template_ms:.3f} ms/piece")
+    print(f"saving:                 {fresh_ms - template_ms:.3f} ms/piece ({1 - template_ms / fresh_ms:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Round-trip check and per-piece export time of the ezdxf and fast writers.
+
+The fast writer's output is read back with ezdxf and compared with the
+ezdxf writer's, entity by entity; any mismatch aborts before timing.
+Run from the repository root: python benchmarks/dxf_writer.py
+"""
+import io
+import sys
+import timeit
+from pathlib import Path
+
+import ezdxf
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pattern_generator import (  # noqa: E402
+    DXF_WRITERS, build_patterns, grade_measurements, make_grade_rules, sample_measurements, write_dxf,
+)
+from pattern_generator.dxf_export import _export_job  # noqa: E402
+from pattern_generator.geometry import MEASUREMENT_KEYS  # noqa: E402
+
+REPEATS = 200
+
+
+def _entities(text):
+    """Return a comparable summary of every modelspace entity in DXF text."""
+    doc = ezdxf.read(io.StringIO(text))
+    auditor = doc.audit()
+    if auditor.has_errors:
+        raise AssertionError(f"ezdxf audit failed: {auditor.errors}")
+    summary = []
+    for entity in doc.modelspace():
+        item = [entity.dxftype(), entity.dxf.layer, entity.dxf.color]
+        if entity.dxftype() == "LWPOLYLINE":
+            item += [entity.closed, np.asarray(entity.get_points("xyb"))]
+        elif entity.dxftype() == "CIRCLE":
+            item += [np.asarray(entity.dxf.center), entity.dxf.radius]
+        elif entity.dxftype() == "TEXT":
+            item += [entity.dxf.text, np.asarray(entity.dxf.insert), entity.dxf.height]
+        summary.append(item)
+    return summary
+
+
+def _same(a, b):
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.shape(a) == np.shape(b) and np.allclose(a, b, rtol=0, atol=1e-9)
+    return a == b
+
+
+def check_round_trip():
+    """Compare both writers on every piece and size, curve mode and seam allowance setting."""
+    sizes, measurement_array = grade_measurements(sample_measurements, make_grade_rules())
+    checked = 0
+    for size, row in zip(sizes, measurement_array):
+        patterns = build_patterns(dict(zip(MEASUREMENT_KEYS, row.tolist())))
+        for curves in ("polyline", "bulge"):
+            for add_seam_allowance in (True, False):
+                for pattern in patterns:
+                    outputs = []
+                    for writer in DXF_WRITERS:
+                        points, filename, options = _export_job(pattern, add_seam_allowance, curves, writer)
+                        stream = io.StringIO()
+                        write_dxf(points, filename, stream, **options)
+                        outputs.append(_entities(stream.getvalue()))
+                    expected, actual = outputs
+                    where = f"{pattern['name']} {size} curves={curves} seam_allowance={add_seam_allowance}"
+                    if len(expected) != len(actual):
+                        raise AssertionError(f"{where}: {len(actual)} entities, expected {len(expected)}")
+                    for i, (a, b) in enumerate(zip(expected, actual)):
+                        if len(a) != len(b) or not all(_same(x, y) for x, y in zip(a, b)):
+                            raise AssertionError(f"{where}: entity {i} differs: {b[:3]} vs {a[:3]}")
+                    checked += 1
+    print(f"round trip: {checked} pieces match the ezdxf writer")
+
+
+def main():
+    check_round_trip()
+    patterns = build_patterns(sample_measurements)
+    for curves in ("polyline", "bulge"):
+        timings = {}
+        for writer in DXF_WRITERS:
+            jobs = [_export_job(pattern, curves=curves, writer=writer) for pattern in patterns]
+
+            def export():
+                for points, filename, options in jobs:
+                    write_dxf(points, filename, io.StringIO(), **options)
+
+            export()  # build the templates outside the timing
+            timings[writer] = timeit.timeit(export, number=REPEATS) / (REPEATS * len(jobs)) * 1e3
+            print(f"{curves:<8} {writer:<6} {timings[writer]:.3f} ms/piece")
+        print(f"{curves:<8} speedup {timings['ezdxf'] / timings['fast']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
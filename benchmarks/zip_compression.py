@@ -0,0 +1,42 @@
+"""Wall time and archive size of each ZIP compression profile.
+
+Run from the repository root: python benchmarks/zip_compression.py
+"""
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pattern_generator import (  # noqa: E402
+    COMPRESSION_PROFILES, build_patterns, generate_dxf_from_points, sample_measurements,
+)
+from pattern_generator.dxf_export import _export_job, _open_zip  # noqa: E402
+
+# Orders packed into the benchmark archive
+ORDERS = 100
+
+
+def main():
+    # Export once so the timings cover only the compression
+    jobs = [_export_job(pattern) for pattern in build_patterns(sample_measurements)]
+    pieces = [(f"{filename}.dxf", generate_dxf_from_points(points, filename, **options).encode("utf-8"))
+              for points, filename, options in jobs]
+    members = [(f"{order}/{name}", data) for order in range(ORDERS) for name, data in pieces]
+    raw = sum(len(data) for _, data in members)
+    print(f"{len(members)} DXF files, {raw / 1024 / 1024:.1f} MiB uncompressed")
+
+    for profile in COMPRESSION_PROFILES:
+        buffer = io.BytesIO()
+        start = time.perf_counter()
+        with _open_zip(buffer, profile) as zip_file:
+            for name, data in members:
+                zip_file.writestr(name, data)
+        elapsed = time.perf_counter() - start
+        size = buffer.tell()
+        print(f"{profile:<8} {elapsed * 1e3:8.1f} ms  {size / 1024:9.1f} KiB  ratio {raw / size:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Headless shirt pattern generation: geometry, plotting and DXF export.
+
+Nothing in this package imports Streamlit, so batch workers can import it
+directly; app.py is only the interactive front end.
+"""
+from .geometry import (
+    sample_measurements,
+    MEASUREMENT_KEYS,
+    PATTERN_PIECES,
+    PIECE_TITLES,
+    measurements_to_array,
+    validate_measurements,
+    generate_front_panel_batch,
+    generate_back_panel_batch,
+    generate_sleeve_batch,
+    generate_collar_batch,
+    generate_cuff_batch,
+    generate_batch,
+    generate_front_panel,
+    generate_back_panel,
+    generate_sleeve,
+    generate_collar,
+    generate_cuff,
+    build_patterns,
+)
+from .plotting import plot_pattern, generate_all_patterns
+from .artifact_store import artifact_key, DiskArtifactStore
+from .dxf_writer import DXFTemplate
+from .dxf_export import (
+    EXPORT_WORKERS,
+    CURVE_MODES,
+    DXF_WRITERS,
+    DXF_FORMATS,
+    COMPRESSION_PROFILES,
+    build_dxf_document,
+    write_dxf,
+    generate_dxf_from_points,
+    cached_dxf_from_points,
+    iter_dxf_exports,
+    create_dxf_zip,
+    create_batch_dxf_zip,
+    write_dxf_zip,
+    write_batch_dxf_zip,
+)
+from .cache import (
+    PREVIEW_BACKENDS,
+    measurements_hash,
+    LRUCache,
+    pattern_cache,
+    render_pattern_outputs,
+    cached_pattern_outputs,
+    svg_cache,
+    cached_svg,
+)
+from .grading import (
+    STANDARD_SIZES,
+    STANDARD_GRADE_STEP,
+    make_grade_rules,
+    grade_measurements,
+    generate_graded_nest,
+    generate_graded_nest_dxf,
+    create_graded_nest_zip,
+    generate_graded_block_dxf,
+)
+from .nesting import (
+    MARKER_QUANTITIES,
+    GRAIN_ROTATIONS,
+    make_marker,
+    marker_report,
+    generate_marker_dxf,
+    generate_marker_block_dxf,
+)
+from .spatial_index import (
+    bounding_box,
+    points_in_polygon,
+    polygons_intersect,
+    polygon_distance,
+    GridIndex,
+)
+from .seam_allowance import (
+    SEAM_ALLOWANCE,
+    SEAM_ALLOWANCES,
+    offset_polygon,
+    cutting_line,
+)
+from .flatten import (
+    FLATTEN_TOLERANCE,
+    path_segments,
+    bezier_points,
+    flatten_cubics,
+    flatten_path_batch,
+    path_outline,
+    curve_to_arcs,
+    path_to_bulges,
+)
+from .raster import encode_png, render_patterns_png
+from .svg_export import path_data, polygon_data, patterns_to_svg
+from .pdf_export import PAGE_SIZES, clip_polyline, write_tiled_pdf
+from .hpgl_export import UNITS_PER_CM, plan_pen_path, pen_up_travel, iter_hpgl, write_hpgl, write_marker_hpgl
+from .ingest import iter_measurement_blocks, validate_block, iter_pattern_batches, iter_orders
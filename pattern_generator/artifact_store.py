@@ -0,0 +1,112 @@
+"""Persistent content-addressed store for exported artifacts such as DXF files."""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+
+def artifact_key(name, points, **options):
+    """Return the content address for a piece export.
+
+    The key covers the piece name, its point coordinates (rounded to 1e-6 so
+    float noise does not split entries) and the export options.
+    """
+    payload = json.dumps({
+        "name": name,
+        "points": [[round(float(x), 6), round(float(y), 6)] for x, y in points],
+        "options": options,
+    }, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskArtifactStore:
+    """Text or binary artifacts on disk, addressed by key, with a size cap and LRU eviction.
+
+    File modification times record last use, so eviction order survives
+    process restarts and is shared by every process using the directory.
+    Going over max_bytes evicts down to low_water * max_bytes, so the
+    directory scan is paid once per batch of evictions, not on every put.
+    """
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024, suffix=".dxf", low_water=0.9):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._total_bytes = None  # Computed lazily from the directory contents
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + self.suffix)
+
+    def get(self, key, binary=False):
+        """Return the stored text (or bytes if binary) for key, or None if it is not in the store."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        # Mark as recently used for LRU eviction
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return data if binary else data.decode("utf-8")
+
+    def put(self, key, text):
+        """Store text or bytes under key, evicting least recently used artifacts over the cap."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = text.encode("utf-8") if isinstance(text, str) else text
+
+        try:
+            replaced = os.stat(path).st_size
+        except FileNotFoundError:
+            replaced = 0
+
+        # Write to a temporary file and rename so readers never see partial artifacts
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total()
+            else:
+                self._total_bytes += len(data) - replaced
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _artifacts(self):
+        """Yield (mtime, size, path) for every stored artifact."""
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                if not filename.endswith(self.suffix):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+    def _scan_total(self):
+        return sum(size for _, size, _ in self._artifacts())
+
+    def _evict(self):
+        """Delete the oldest artifacts until the store is back under its low-water mark."""
+        artifacts = sorted(self._artifacts())
+        total = sum(size for _, size, _ in artifacts)
+        for _, size, path in artifacts:
+            if total <= self.max_bytes * self.low_water:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._total_bytes = total
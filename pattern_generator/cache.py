@@ -0,0 +1,123 @@
+"""Caches for generated pattern outputs."""
+import hashlib
+import io
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from .geometry import build_patterns
+from .plotting import generate_all_patterns
+from .dxf_export import create_dxf_zip
+from .raster import render_patterns_png
+from .svg_export import patterns_to_svg
+
+# Preview renderers: the full matplotlib figure, or the fast NumPy rasterizer
+PREVIEW_BACKENDS = ("matplotlib", "raster")
+
+
+def measurements_hash(measurements):
+    """Return a canonical SHA-256 hex digest of a measurements dict.
+
+    Keys are sorted and numbers normalised to float, so {"chest": 100} and
+    {"chest": 100.0} hash the same.
+    """
+    canonical = {key: float(value) if isinstance(value, (int, float)) else value
+                 for key, value in measurements.items()}
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-memory cache with LRU eviction and a per-entry TTL."""
+
+    def __init__(self, max_entries=128, ttl=3600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl  # Seconds; None keeps entries until evicted
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        """Store value under key, evicting the least recently used entries."""
+        expires = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Process-wide cache of (figure PNG, DXF ZIP) bytes keyed by measurements hash.
+# Imported modules survive Streamlit reruns, so this persists across clicks.
+pattern_cache = LRUCache()
+
+
+def render_pattern_outputs(measurements, preview="matplotlib", **export_options):
+    """Generate the preview PNG and DXF ZIP bytes for a measurements dict.
+
+    preview selects one of PREVIEW_BACKENDS; export_options are passed to
+    create_dxf_zip (e.g. curves="spline", compression="fast").
+    """
+    if preview == "raster":
+        pattern_data = build_patterns(measurements)
+        png_bytes = render_patterns_png(pattern_data)
+    elif preview == "matplotlib":
+        import matplotlib.pyplot as plt
+
+        fig, pattern_data = generate_all_patterns(measurements)
+        png_buffer = io.BytesIO()
+        fig.savefig(png_buffer, format="png")
+        plt.close(fig)
+        png_bytes = png_buffer.getvalue()
+    else:
+        raise ValueError(f"Unknown preview backend {preview!r}, expected one of {PREVIEW_BACKENDS}")
+    zip_bytes = create_dxf_zip(pattern_data, **export_options).getvalue()
+    return png_bytes, zip_bytes
+
+
+def cached_pattern_outputs(measurements, cache=pattern_cache, preview="matplotlib", **export_options):
+    """Return (png_bytes, zip_bytes) for measurements, served from cache when possible."""
+    key = measurements_hash(measurements) + ":" + preview
+    if export_options:
+        key += ":" + json.dumps(export_options, sort_keys=True)
+    outputs = cache.get(key)
+    if outputs is None:
+        outputs = render_pattern_outputs(measurements, preview, **export_options)
+        cache.put(key, outputs)
+    return outputs
+
+
+# SVG previews for the storefront, cached separately from the PNG/ZIP outputs
+svg_cache = LRUCache(max_entries=1024)
+
+
+def cached_svg(measurements, cache=svg_cache):
+    """Return the SVG preview for measurements, served from cache when possible."""
+    key = measurements_hash(measurements)
+    svg = cache.get(key)
+    if svg is None:
+        svg = patterns_to_svg(build_patterns(measurements))
+        cache.put(key, svg)
+    return svg
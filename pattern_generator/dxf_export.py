@@ -0,0 +1,473 @@
+"""DXF export of pattern pieces and ZIP packaging."""
+import ezdxf
+import io
+import numpy as np
+import os
+import itertools
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .artifact_store import artifact_key
+from .dxf_writer import DXFTemplate
+from .flatten import FLATTEN_TOLERANCE, path_segments, path_to_bulges
+from .seam_allowance import SEAM_ALLOWANCE, offset_polygon
+
+
+# How curved edges are written to the PATTERN_OUTLINE layer:
+# "polyline" - the flattened outline as one closed LWPOLYLINE (works with every cutter)
+# "spline" - each Bézier segment as a SPLINE entity, straight runs as open LWPOLYLINEs
+# "bulge" - one closed LWPOLYLINE with curves approximated by bulge arcs
+CURVE_MODES = ("polyline", "spline", "bulge")
+
+# How piece DXFs are serialized:
+# "ezdxf" - through ezdxf's object model (every curve mode)
+# "fast" - entity records emitted directly into a pre-serialized template;
+#          the "spline" curve mode still goes through ezdxf
+DXF_WRITERS = ("ezdxf", "fast")
+
+# DXF file formats: "asc" (ASCII text) or "bin" (binary DXF, smaller and faster to load)
+DXF_FORMATS = ("asc", "bin")
+
+# ZIP compression profiles: name -> (compression method, compresslevel)
+# "fast" for interactive downloads, "max"/"lzma" for archival, "store" for local hand-off
+COMPRESSION_PROFILES = {
+    "fast": (zipfile.ZIP_DEFLATED, 1),
+    "default": (zipfile.ZIP_DEFLATED, None),
+    "max": (zipfile.ZIP_DEFLATED, 9),
+    "lzma": (zipfile.ZIP_LZMA, None),
+    "store": (zipfile.ZIP_STORED, None),
+}
+
+# Per-thread template documents used by write_dxf, keyed by (writer, add_seam_allowance)
+_templates = threading.local()
+
+
+def build_dxf_document(points, filename, add_seam_allowance=True, cutting_line=None, outline=None,
+                       curves="polyline", path_vertices=None, path_codes=None, tolerance=FLATTEN_TOLERANCE):
+    """Build the ezdxf document for a pattern piece.
+
+    outline is the flattened stitching line (see flatten.path_outline); the
+    key points are used as the outline when it is not given. With
+    add_seam_allowance the cutting line is drawn on a SEAM_ALLOWANCE layer;
+    if cutting_line is not given it is offset from the outline by
+    SEAM_ALLOWANCE.
+
+    curves selects one of CURVE_MODES. The "spline" and "bulge" modes need the
+    piece's path_vertices and path_codes and fall back to "polyline" without them.
+    """
+    doc = _new_document(add_seam_allowance)
+    _add_piece_entities(doc.modelspace(), points, filename, add_seam_allowance, cutting_line, outline,
+                        curves, path_vertices, path_codes, tolerance)
+    return doc
+
+
+def _new_document(add_seam_allowance=True):
+    """Create an empty R2010 document with the pattern layers."""
+    # Create a new DXF document with the R2010 specification
+    doc = ezdxf.new('R2010')
+
+    # Create a new layer for the pattern outline
+    doc.layers.new(name='PATTERN_OUTLINE', dxfattribs={'color': 1})  # Color 1 = red
+
+    # Create a layer for points
+    doc.layers.new(name='POINTS', dxfattribs={'color': 5})  # Color 5 = blue
+
+    # Create a layer for text labels
+    doc.layers.new(name='TEXT', dxfattribs={'color': 3})  # Color 3 = green
+
+    if add_seam_allowance:
+        # Create a layer for the cutting line
+        doc.layers.new(name='SEAM_ALLOWANCE', dxfattribs={'color': 4})  # Color 4 = cyan
+
+    return doc
+
+
+def _add_piece_entities(msp, points, filename, add_seam_allowance=True, cutting_line=None, outline=None,
+                        curves="polyline", path_vertices=None, path_codes=None, tolerance=FLATTEN_TOLERANCE):
+    """Add the outline, cutting line, point markers and labels of a piece to a layout."""
+    if curves not in CURVE_MODES:
+        raise ValueError(f"Unknown curve mode {curves!r}, expected one of {CURVE_MODES}")
+    if path_vertices is None or path_codes is None:
+        curves = "polyline"
+    outline = points if outline is None else _clean_points(outline)
+
+    # Create the main pattern outline on the PATTERN_OUTLINE layer
+    outline_attribs = {'layer': 'PATTERN_OUTLINE', 'color': 1}
+    if curves == "polyline":
+        polyline = msp.add_lwpolyline(outline, dxfattribs=outline_attribs)
+        polyline.close(True)  # Close the polyline
+    elif curves == "bulge":
+        msp.add_lwpolyline(path_to_bulges(path_vertices, path_codes, tolerance), format='xyb',
+                           close=True, dxfattribs=outline_attribs)
+    else:
+        _add_spline_outline(msp, path_vertices, path_codes, outline_attribs)
+
+    lowest = min(p[1] for p in points)
+    if add_seam_allowance:
+        if cutting_line is None:
+            cutting_line = offset_polygon(outline, SEAM_ALLOWANCE)
+        cutting_line = _clean_points(cutting_line)
+        msp.add_lwpolyline(cutting_line, close=True, dxfattribs={'layer': 'SEAM_ALLOWANCE', 'color': 4})
+        lowest = min(lowest, min(p[1] for p in cutting_line))
+
+    # Add points as reference on the POINTS layer
+    for i, (x, y) in enumerate(points):
+        # Add a point marker (small circle)
+        msp.add_circle((x, y), radius=0.5, dxfattribs={'layer': 'POINTS', 'color': 5})
+
+        # Add point number label on the TEXT layer
+        msp.add_text(f"P{i}", dxfattribs={
+            'height': 0.8,
+            'layer': 'TEXT',
+            'color': 3,
+            'insert': (x + 0.6, y + 0.6)
+        })
+
+    # Add filename as title
+    msp.add_text(f"{filename.upper()} PATTERN", dxfattribs={
+        'height': 2.0,
+        'layer': 'TEXT',
+        'color': 2,  # Color 2 = yellow
+        'insert': (points[0][0], max(p[1] for p in points) + 5)
+    })
+
+    # Add a note about seam allowance
+    note = "NOTE: CUT ON SEAM_ALLOWANCE LINE" if add_seam_allowance else f"NOTE: ADD {SEAM_ALLOWANCE}cm SEAM ALLOWANCE"
+    msp.add_text(note, dxfattribs={
+        'height': 1.0,
+        'layer': 'TEXT',
+        'color': 2,
+        'insert': (points[0][0], lowest - 5)
+    })
+
+
+def _add_spline_outline(msp, path_vertices, path_codes, dxfattribs):
+    """Add a path as SPLINE entities for curves and open LWPOLYLINEs for straight runs."""
+    run = []
+    for code, controls in path_segments(path_vertices, path_codes):
+        controls = _clean_points(controls)
+        if len(controls) == 2:
+            if not run:
+                run.append(controls[0])
+            run.append(controls[1])
+            continue
+        if run:
+            msp.add_lwpolyline(run, dxfattribs=dxfattribs)
+            run = []
+        # A single Bézier segment is a B-spline with open uniform knots
+        msp.add_open_spline(controls, degree=len(controls) - 1, dxfattribs=dxfattribs)
+    if run:
+        msp.add_lwpolyline(run, dxfattribs=dxfattribs)
+
+
+def _template_document(add_seam_allowance=True, writer="ezdxf"):
+    """Return this thread's reusable empty document for the given layer set.
+
+    ezdxf.new() sets up the full default tables and objects on every call;
+    writing pieces through one template per thread and clearing its
+    modelspace afterwards skips that setup for all but the first piece.
+    For the "fast" writer the template is a DXFTemplate of the same document.
+    """
+    templates = getattr(_templates, "documents", None)
+    if templates is None:
+        templates = _templates.documents = {}
+    key = (writer, bool(add_seam_allowance))
+    if key not in templates:
+        doc = _new_document(add_seam_allowance)
+        templates[key] = DXFTemplate(doc) if writer == "fast" else doc
+    return templates[key]
+
+
+def write_dxf(points, filename, stream, add_seam_allowance=True, writer="ezdxf", fmt="asc", **options):
+    """Write the DXF for a pattern piece straight to a text or binary stream.
+
+    writer selects one of DXF_WRITERS and fmt one of DXF_FORMATS; binary
+    DXF needs a binary stream and is always written through ezdxf.
+    """
+    if writer not in DXF_WRITERS:
+        raise ValueError(f"Unknown DXF writer {writer!r}, expected one of {DXF_WRITERS}")
+    if fmt not in DXF_FORMATS:
+        raise ValueError(f"Unknown DXF format {fmt!r}, expected one of {DXF_FORMATS}")
+    if writer == "fast" and fmt == "asc" and options.get("curves", "polyline") != "spline":
+        _write_fast_dxf(points, filename, stream, add_seam_allowance, **options)
+        return
+    doc = _template_document(add_seam_allowance)
+    msp = doc.modelspace()
+    try:
+        _add_piece_entities(msp, points, filename, add_seam_allowance, **options)
+        if fmt == "bin":
+            doc.write(stream, fmt="bin")
+        elif isinstance(stream, (io.RawIOBase, io.BufferedIOBase)):
+            text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+            doc.write(text)
+            text.detach()
+        else:
+            doc.write(stream)
+    finally:
+        msp.delete_all_entities()
+        doc.entitydb.purge()
+
+
+def _write_fast_dxf(points, filename, stream, add_seam_allowance=True, cutting_line=None, outline=None,
+                    curves="polyline", path_vertices=None, path_codes=None, tolerance=FLATTEN_TOLERANCE):
+    """Write the same entities as _add_piece_entities through a DXFTemplate."""
+    if curves not in CURVE_MODES:
+        raise ValueError(f"Unknown curve mode {curves!r}, expected one of {CURVE_MODES}")
+    template = _template_document(add_seam_allowance, writer="fast")
+    points = np.asarray(points, dtype=float)
+    outline = points if outline is None else np.asarray(outline, dtype=float)
+
+    if curves == "bulge" and path_vertices is not None and path_codes is not None:
+        bulged = np.asarray(path_to_bulges(path_vertices, path_codes, tolerance), dtype=float)
+        template.lwpolyline(bulged[:, :2], 'PATTERN_OUTLINE', 1, closed=True, bulges=bulged[:, 2])
+    else:
+        template.lwpolyline(outline, 'PATTERN_OUTLINE', 1, closed=True)
+
+    lowest = points[:, 1].min()
+    if add_seam_allowance:
+        if cutting_line is None:
+            cutting_line = offset_polygon(_clean_points(outline), SEAM_ALLOWANCE)
+        cutting_line = np.asarray(cutting_line, dtype=float)
+        template.lwpolyline(cutting_line, 'SEAM_ALLOWANCE', 4, closed=True)
+        lowest = min(lowest, cutting_line[:, 1].min())
+
+    for i, (x, y) in enumerate(points.tolist()):
+        template.circle((x, y), 0.5, 'POINTS', 5)
+        template.text(f"P{i}", (x + 0.6, y + 0.6), 0.8, 'TEXT', 3)
+
+    template.text(f"{filename.upper()} PATTERN", (points[0, 0], points[:, 1].max() + 5), 2.0, 'TEXT', 2)
+    note = "NOTE: CUT ON SEAM_ALLOWANCE LINE" if add_seam_allowance else f"NOTE: ADD {SEAM_ALLOWANCE}cm SEAM ALLOWANCE"
+    template.text(note, (points[0, 0], lowest - 5), 1.0, 'TEXT', 2)
+    template.write(stream)
+
+
+def generate_dxf_from_points(points, filename, add_seam_allowance=True, fmt="asc", **options):
+    """Generate a DXF file from pattern points.
+
+    Returns text for ASCII DXF and bytes for binary DXF (fmt="bin").
+    """
+    # Create a buffer for the DXF data
+    stream = io.BytesIO() if fmt == "bin" else io.StringIO()
+    write_dxf(points, filename, stream, add_seam_allowance=add_seam_allowance, fmt=fmt, **options)
+    return stream.getvalue()
+
+
+def _serialize(doc, fmt="asc"):
+    """Return an ezdxf document as DXF text, or bytes for binary DXF (fmt="bin")."""
+    if fmt == "bin":
+        stream = io.BytesIO()
+        doc.write(stream, fmt="bin")
+    else:
+        stream = io.StringIO()
+        doc.write(stream)
+    return stream.getvalue()
+
+
+def cached_dxf_from_points(points, filename, store=None, **options):
+    """Return the DXF data for a piece, reusing it from store when already exported."""
+    if store is None:
+        return generate_dxf_from_points(points, filename, **options)
+
+    key = artifact_key(filename, points, **options)
+    dxf_data = store.get(key, binary=options.get("fmt") == "bin")
+    if dxf_data is None:
+        dxf_data = generate_dxf_from_points(points, filename, **options)
+        store.put(key, dxf_data)
+    return dxf_data
+
+
+# Default number of export worker processes; 1 exports in-process and 0 uses every CPU
+EXPORT_WORKERS = int(os.environ.get("PATTERN_EXPORT_WORKERS", "1"))
+
+
+def _export_piece(job):
+    """Build the DXF data for one (points, filename, options) job."""
+    points, filename, options = job
+    return generate_dxf_from_points(points, filename, **options)
+
+
+def _export_job(pattern, add_seam_allowance=True, curves="polyline", writer="ezdxf", fmt="asc"):
+    """Return the (points, filename, options) export job for a pattern dict."""
+    options = {"add_seam_allowance": add_seam_allowance}
+    if writer != "ezdxf":
+        options["writer"] = writer
+    if fmt != "asc":
+        options["fmt"] = fmt
+    if curves != "polyline" and pattern.get("path") is not None:
+        options["curves"] = curves
+        options["path_vertices"] = _clean_points(pattern["path"].vertices)
+        options["path_codes"] = [int(code) for code in pattern["path"].codes]
+    if pattern.get("outline") is not None:
+        options["outline"] = _clean_points(pattern["outline"])
+    if add_seam_allowance and pattern.get("cutting_line") is not None:
+        options["cutting_line"] = _clean_points(pattern["cutting_line"])
+    return _clean_points(pattern["points"]), pattern["name"], options
+
+
+def _clean_points(points):
+    """Convert points to a list of tuples with explicit float values.
+
+    This ensures compatibility with ezdxf.
+    """
+    return [(float(p[0]), float(p[1])) for p in points]
+
+
+def _resolve_workers(workers):
+    if workers is None:
+        workers = EXPORT_WORKERS
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def iter_dxf_exports(patterns, workers=None, store=None, **options):
+    """Export pattern dicts to DXF data (text, or bytes for binary DXF), yielding results in input order.
+
+    options (add_seam_allowance, curves, writer, fmt) are passed to every piece's export.
+
+    With more than one worker the pieces are built in a process pool with a
+    bounded number in flight; if the pool cannot be started, or breaks, the
+    remaining pieces are exported in-process. Pieces found in store are not
+    sent to the pool at all.
+    """
+    workers = _resolve_workers(workers)
+    executor = None
+    if workers > 1:
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        except (OSError, NotImplementedError, ValueError):
+            executor = None
+
+    # Each pending entry is (store key, job, DXF data or future)
+    pending = deque()
+
+    def finish(entry):
+        key, job, result = entry
+        if not isinstance(result, (str, bytes)):
+            try:
+                result = result.result()
+            except BrokenProcessPool:
+                result = _export_piece(job)
+            if store is not None:
+                store.put(key, result)
+        return result
+
+    try:
+        for pattern in patterns:
+            job = _export_job(pattern, **options)
+
+            key = result = None
+            if store is not None:
+                key = artifact_key(job[1], job[0], **job[2])
+                result = store.get(key, binary=job[2].get("fmt") == "bin")
+            if result is None:
+                if executor is not None:
+                    try:
+                        result = executor.submit(_export_piece, job)
+                    except BrokenProcessPool:
+                        # Reap the dead pool now; its pending futures fall back in finish()
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        executor = None
+                if result is None:
+                    result = _export_piece(job)
+                    if store is not None:
+                        store.put(key, result)
+            pending.append((key, job, result))
+
+            if len(pending) > workers * 4:
+                yield finish(pending.popleft())
+
+        while pending:
+            yield finish(pending.popleft())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def _open_zip(fileobj, compression="default"):
+    """Open a new ZIP for writing with one of COMPRESSION_PROFILES."""
+    if compression not in COMPRESSION_PROFILES:
+        raise ValueError(f"Unknown compression profile {compression!r}, "
+                         f"expected one of {tuple(COMPRESSION_PROFILES)}")
+    method, level = COMPRESSION_PROFILES[compression]
+    return zipfile.ZipFile(fileobj, 'w', method, compresslevel=level)
+
+
+def create_dxf_zip(patterns, store=None, workers=None, compression="default", **options):
+    """Create a ZIP file containing all pattern pieces as DXF files.
+
+    If store (a DiskArtifactStore) is given, pieces already exported with the
+    same name and points are read back from it instead of being rebuilt.
+    workers sets the number of export processes, compression one of
+    COMPRESSION_PROFILES and options are the per-piece export options (see
+    iter_dxf_exports).
+    """
+    zip_buffer = io.BytesIO()
+    with _open_zip(zip_buffer, compression) as zip_file:
+        patterns = list(patterns)
+        for pattern, dxf_data in zip(patterns, iter_dxf_exports(patterns, workers, store, **options)):
+            zip_file.writestr(f"{pattern['name']}.dxf", dxf_data)
+
+    zip_buffer.seek(0)
+    return zip_buffer
+
+
+def create_batch_dxf_zip(orders, store=None, workers=None, compression="default", **options):
+    """Create one ZIP for many orders, with each order's pieces in its own folder.
+
+    orders is an iterable of (order_id, patterns) pairs. Pieces from every
+    order share one export pool, so small orders still keep all workers busy.
+    """
+    orders = list(orders)
+    names = [f"{order_id}/{pattern['name']}.dxf" for order_id, patterns in orders for pattern in patterns]
+    pieces = (pattern for _, patterns in orders for pattern in patterns)
+
+    zip_buffer = io.BytesIO()
+    with _open_zip(zip_buffer, compression) as zip_file:
+        for name, dxf_data in zip(names, iter_dxf_exports(pieces, workers, store, **options)):
+            zip_file.writestr(name, dxf_data)
+
+    zip_buffer.seek(0)
+    return zip_buffer
+
+
+def _stream_dxf_zip(members, fileobj, workers=None, store=None, compression="default", **options):
+    """Write (arcname, pattern) members as DXF files into a ZIP on fileobj."""
+    workers = _resolve_workers(workers)
+    with _open_zip(fileobj, compression) as zip_file:
+        if workers <= 1 and store is None:
+            # In-process: each document is written straight into its compressed member
+            for arcname, pattern in members:
+                points, filename, piece_options = _export_job(pattern, **options)
+                with zip_file.open(arcname, 'w') as member:
+                    write_dxf(points, filename, member, **piece_options)
+            return
+
+        # Pool or store: at most a few finished pieces are held before being written
+        names, pieces = itertools.tee(members)
+        pieces = (pattern for _, pattern in pieces)
+        for (arcname, _), dxf_data in zip(names, iter_dxf_exports(pieces, workers, store, **options)):
+            zip_file.writestr(arcname, dxf_data)
+
+
+def write_dxf_zip(patterns, fileobj, store=None, workers=None, compression="default", **options):
+    """Stream a ZIP of all pattern pieces as DXF files to a file or response object.
+
+    fileobj only needs a write method; it does not have to be seekable.
+    Unlike create_dxf_zip, memory use does not grow with the archive size.
+    """
+    members = ((f"{pattern['name']}.dxf", pattern) for pattern in patterns)
+    _stream_dxf_zip(members, fileobj, workers, store, compression, **options)
+
+
+def write_batch_dxf_zip(orders, fileobj, store=None, workers=None, compression="default", **options):
+    """Stream a ZIP of many orders to fileobj, with each order's pieces in its own folder.
+
+    orders is an iterable of (order_id, patterns) pairs and is consumed lazily,
+    so it can be a generator over millions of orders.
+    """
+    members = ((f"{order_id}/{pattern['name']}.dxf", pattern) for order_id, patterns in orders for pattern in patterns)
+    _stream_dxf_zip(members, fileobj, workers, store, compression, **options)
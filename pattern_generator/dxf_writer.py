@@ -0,0 +1,78 @@
+"""Minimal ASCII DXF emitter for LWPOLYLINE, CIRCLE and TEXT entities.
+
+The header, tables, blocks and objects sections come from an ezdxf document
+serialized once; only the ENTITIES section is written per piece, straight
+from NumPy vertex arrays, so no ezdxf entity objects are created.
+"""
+import io
+import re
+
+import numpy as np
+
+_HANDSEED = re.compile(r"(\$HANDSEED\n  5\n)([0-9A-Fa-f]+)\n")
+_ENTITIES = "  0\nSECTION\n  2\nENTITIES\n"
+
+
+class DXFTemplate:
+    """The serialized sections of an empty ezdxf document around its ENTITIES section.
+
+    Entities added with the lwpolyline/circle/text methods are buffered
+    until write(), which emits the complete drawing and starts a new one.
+    """
+
+    def __init__(self, doc):
+        stream = io.StringIO()
+        doc.write(stream)
+        text = stream.getvalue()
+        start = text.index(_ENTITIES) + len(_ENTITIES)
+        end = text.index("  0\nENDSEC\n", start)
+        if text[start:end]:
+            raise ValueError("Template document must have an empty modelspace")
+        seed = _HANDSEED.search(text)
+        self._head = text[:seed.start(2)]
+        self._header_rest = text[seed.end(2):start]
+        self._tail = text[end:]
+        self._first_handle = int(seed.group(2), 16)
+        self._owner = doc.modelspace().layout_key
+        self._chunks = []
+        self._handle = self._first_handle
+
+    def _entity(self, dxftype, layer, color, subclass):
+        handle = self._handle
+        self._handle += 1
+        return (f"  0\n{dxftype}\n  5\n{handle:X}\n330\n{self._owner}\n100\nAcDbEntity\n"
+                f"  8\n{layer}\n 62\n{color}\n100\n{subclass}\n")
+
+    def lwpolyline(self, points, layer, color, closed=False, bulges=None):
+        """Add an LWPOLYLINE through an (N, 2) array, with optional per-vertex bulges."""
+        points = np.asarray(points, dtype=float)
+        chunks = [self._entity("LWPOLYLINE", layer, color, "AcDbPolyline"),
+                  f" 90\n{len(points)}\n 70\n{1 if closed else 0}\n"]
+        if bulges is None:
+            chunks.extend(f" 10\n{x}\n 20\n{y}\n" for x, y in points.tolist())
+        else:
+            for (x, y), bulge in zip(points.tolist(), np.asarray(bulges, dtype=float).tolist()):
+                chunks.append(f" 10\n{x}\n 20\n{y}\n 42\n{bulge}\n" if bulge else f" 10\n{x}\n 20\n{y}\n")
+        self._chunks.extend(chunks)
+
+    def circle(self, center, radius, layer, color):
+        """Add a CIRCLE entity."""
+        x, y = (float(v) for v in center)
+        self._chunks.append(self._entity("CIRCLE", layer, color, "AcDbCircle")
+                            + f" 10\n{x}\n 20\n{y}\n 30\n0.0\n 40\n{float(radius)}\n")
+
+    def text(self, string, insert, height, layer, color):
+        """Add a single-line TEXT entity."""
+        x, y = (float(v) for v in insert)
+        self._chunks.append(self._entity("TEXT", layer, color, "AcDbText")
+                            + f" 10\n{x}\n 20\n{y}\n 30\n0.0\n 40\n{float(height)}\n  1\n{string}\n100\nAcDbText\n")
+
+    def write(self, stream):
+        """Write the drawing to a text or binary stream and clear the buffered entities."""
+        text = "".join([self._head, f"{self._handle:X}", self._header_rest, *self._chunks, self._tail])
+        self._chunks = []
+        self._handle = self._first_handle
+        if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)):
+            stream.write(text.encode("utf-8"))
+        else:
+            stream.write(text)
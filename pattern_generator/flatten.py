@@ -0,0 +1,265 @@
+"""Adaptive flattening of pattern paths into polygons for cutting and nesting."""
+import numpy as np
+from matplotlib.path import Path
+
+# Default maximum distance (cm) between a curve and its flattened polyline
+FLATTEN_TOLERANCE = 0.01
+
+# Subdivision depth limit; 2**16 pieces per curve is far below any cutter resolution
+MAX_SUBDIVISIONS = 16
+
+
+def _segment_indices(codes):
+    """Return (code, vertex indices) for each segment of a closed path.
+
+    The indices start at the end point of the previous segment, so lines
+    have 2 indices, CURVE3 segments 3 and CURVE4 segments 4.
+    """
+    segments = []
+    start = current = None
+    i = 0
+    while i < len(codes):
+        code = codes[i]
+        if code == Path.MOVETO:
+            start = current = i
+            i += 1
+        elif code == Path.LINETO:
+            segments.append((code, [current, i]))
+            current = i
+            i += 1
+        elif code == Path.CURVE3:
+            segments.append((code, [current, i, i + 1]))
+            current = i + 1
+            i += 2
+        elif code == Path.CURVE4:
+            segments.append((code, [current, i, i + 1, i + 2]))
+            current = i + 2
+            i += 3
+        elif code == Path.CLOSEPOLY:
+            segments.append((Path.LINETO, [current, start]))
+            current = start
+            i += 1
+        else:
+            raise ValueError(f"Unsupported path code {code}")
+    return segments
+
+
+def path_segments(vertices, codes):
+    """Split a closed path into segments.
+
+    Returns a list of (code, control_points) where control_points starts at
+    the end of the previous segment: 2 points for lines, 3 for CURVE3 and 4
+    for CURVE4. Zero-length closing lines are dropped.
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    segments = [(code, vertices[indices]) for code, indices in _segment_indices(codes)]
+    return [(code, controls) for code, controls in segments
+            if code != Path.LINETO or not np.allclose(controls[0], controls[1])]
+
+
+def bezier_points(control_points, t):
+    """Evaluate a Bézier curve of any degree at the parameters t (de Casteljau)."""
+    t = np.asarray(t, dtype=float)[:, None]
+    points = np.repeat(control_points[None], len(t), axis=0)
+    while points.shape[1] > 1:
+        points = points[:, :-1] * (1 - t[:, None]) + points[:, 1:] * t[:, None]
+    return points[:, 0]
+
+
+def _as_cubic(controls):
+    """Degree-elevate (..., 3, 2) quadratic control points to (..., 4, 2) cubics."""
+    p0, p1, p2 = controls[..., 0, :], controls[..., 1, :], controls[..., 2, :]
+    return np.stack([p0, p0 + 2 / 3 * (p1 - p0), p2 + 2 / 3 * (p1 - p2), p2], axis=-2)
+
+
+def _chord_height(p, p0, chord, chord_length):
+    """Distance of each control point p from its chord segment, and whether it projects onto it.
+
+    For a degenerate chord the distance is from p0 and the point counts as inside.
+    """
+    offset = p - p0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.einsum("ij,ij->i", offset, chord) / chord_length ** 2
+    degenerate = chord_length <= 1e-12
+    t = np.where(degenerate, 0.0, t)
+    closest = p0 + np.clip(t, 0, 1)[:, None] * chord
+    return np.linalg.norm(p - closest, axis=1), degenerate | ((t >= 0) & (t <= 1))
+
+
+def flatten_cubics(curves, tolerance=FLATTEN_TOLERANCE):
+    """Flatten many cubic Bézier curves at once by adaptive subdivision.
+
+    curves is a (C, 4, 2) array. Every curve is halved (de Casteljau at
+    t = 0.5) until its control points lie within the chord-height bound of
+    tolerance, with all curves processed together in each pass. Returns a
+    list of C arrays holding the vertices of each flattened curve, excluding
+    its end point.
+    """
+    curves = np.asarray(curves, dtype=float)
+    active = curves
+    ids = np.arange(len(curves))
+    starts = np.zeros(len(curves))
+    width = np.ones(len(curves))
+    done_ids, done_t, done_points = [], [], []
+
+    for depth in range(MAX_SUBDIVISIONS + 1):
+        if not len(active):
+            break
+        p0, p1, p2, p3 = (active[:, k] for k in range(4))
+        chord = p3 - p0
+        chord_length = np.linalg.norm(chord, axis=1)
+
+        # A cubic whose control points project inside the chord stays within 3/4
+        # of its control polygon's height above the chord
+        h1, inside1 = _chord_height(p1, p0, chord, chord_length)
+        h2, inside2 = _chord_height(p2, p0, chord, chord_length)
+        flat = (0.75 * np.maximum(h1, h2) <= tolerance) & inside1 & inside2
+        if depth == MAX_SUBDIVISIONS:
+            flat[:] = True
+        done_ids.append(ids[flat])
+        done_t.append(starts[flat])
+        done_points.append(p0[flat])
+
+        # Split the remaining curves in half
+        rest = active[~flat]
+        a = (rest[:, :-1] + rest[:, 1:]) / 2
+        b = (a[:, :-1] + a[:, 1:]) / 2
+        c = (b[:, :-1] + b[:, 1:]) / 2
+        left = np.stack([rest[:, 0], a[:, 0], b[:, 0], c[:, 0]], axis=1)
+        right = np.stack([c[:, 0], b[:, 1], a[:, 2], rest[:, 3]], axis=1)
+        active = np.concatenate([left, right])
+        half = width[~flat] / 2
+        ids = np.concatenate([ids[~flat], ids[~flat]])
+        starts = np.concatenate([starts[~flat], starts[~flat] + half])
+        width = np.concatenate([half, half])
+
+    ids, t, points = np.concatenate(done_ids), np.concatenate(done_t), np.concatenate(done_points)
+    order = np.lexsort((t, ids))
+    ids, points = ids[order], points[order]
+    return np.split(points, np.searchsorted(ids, np.arange(1, len(curves))))
+
+
+def flatten_path_batch(vertices, codes, tolerance=FLATTEN_TOLERANCE):
+    """Flatten a batch of closed paths that share the same codes.
+
+    vertices is an (N, V, 2) array. All curves of all N paths are
+    subdivided together. Returns a list of N (outline, edge_ids) pairs,
+    where outline is the (M, 2) polygon without a repeated closing vertex
+    and edge_ids gives the path segment that starts at each vertex.
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    n = len(vertices)
+    segments = _segment_indices(codes)
+
+    # Gather every curve segment of every path into one cubic array
+    curve_segments = [k for k, (code, _) in enumerate(segments) if code != Path.LINETO]
+    cubics = []
+    for k in curve_segments:
+        code, indices = segments[k]
+        controls = vertices[:, indices]
+        cubics.append(_as_cubic(controls) if code == Path.CURVE3 else controls)
+    flattened = flatten_cubics(np.concatenate(cubics), tolerance) if cubics else []
+
+    results = []
+    for row in range(n):
+        parts, edge_ids = [], []
+        for k, (code, indices) in enumerate(segments):
+            if code == Path.LINETO:
+                points = vertices[row, indices[:1]]
+            else:
+                points = flattened[curve_segments.index(k) * n + row]
+            parts.append(points)
+            edge_ids.append(np.full(len(points), k))
+        outline = np.concatenate(parts)
+        edge_ids = np.concatenate(edge_ids)
+
+        # Drop zero-length edges so every edge has a direction
+        keep = np.linalg.norm(np.roll(outline, -1, axis=0) - outline, axis=1) > 1e-9
+        results.append((outline[keep], edge_ids[keep]))
+    return results
+
+
+def path_outline(vertices, codes, tolerance=FLATTEN_TOLERANCE):
+    """Flatten a closed path into a polygon within tolerance of its curves.
+
+    Returns the (M, 2) polygon without a repeated closing vertex, and an (M,)
+    array giving the index of the path segment that starts at each vertex.
+    """
+    return flatten_path_batch(np.asarray(vertices, dtype=float)[None], codes, tolerance)[0]
+
+
+def _arc_through(a, m, b):
+    """Return (center, radius) of the circle through three points, or None if collinear."""
+    d = 2 * (a[0] * (m[1] - b[1]) + m[0] * (b[1] - a[1]) + b[0] * (a[1] - m[1]))
+    if abs(d) < 1e-12:
+        return None
+    a2, m2, b2 = a @ a, m @ m, b @ b
+    center = np.array([
+        (a2 * (m[1] - b[1]) + m2 * (b[1] - a[1]) + b2 * (a[1] - m[1])) / d,
+        (a2 * (b[0] - m[0]) + m2 * (a[0] - b[0]) + b2 * (m[0] - a[0])) / d,
+    ])
+    return center, np.linalg.norm(a - center)
+
+
+def _arc_bulge(a, m, b):
+    """Return the DXF bulge of the arc from a to b passing through m.
+
+    The bulge is tan(sweep / 4), positive for counter-clockwise arcs.
+    """
+    u, v = a - m, b - m
+    # The inscribed angle at m is pi - sweep / 2
+    inscribed = np.arctan2(abs(u[0] * v[1] - u[1] * v[0]), u @ v)
+    sweep = 2 * (np.pi - inscribed)
+    chord = b - a
+    side = chord[0] * (m - a)[1] - chord[1] * (m - a)[0]
+    return float(np.tan(sweep / 4) * (-1 if side > 0 else 1))
+
+
+def curve_to_arcs(controls, tolerance=FLATTEN_TOLERANCE, depth=0):
+    """Approximate a Bézier curve with circular arcs within tolerance.
+
+    Returns a list of (start_point, bulge) pairs; each arc ends where the
+    next one starts and the last ends at the curve's end point.
+    """
+    a, m, b = bezier_points(controls, [0, 0.5, 1])
+    arc = _arc_through(a, m, b)
+    samples = bezier_points(controls, [0.125, 0.25, 0.375, 0.625, 0.75, 0.875])
+    if arc is None:
+        # Straight: a zero bulge is exact if the samples lie on the chord
+        chord = b - a
+        length = np.linalg.norm(chord)
+        error = (np.abs(chord[0] * (samples - a)[:, 1] - chord[1] * (samples - a)[:, 0]) / length).max() \
+            if length > 1e-12 else 0.0
+        bulge = 0.0
+    else:
+        center, radius = arc
+        error = np.abs(np.linalg.norm(samples - center, axis=1) - radius).max()
+        bulge = _arc_bulge(a, m, b)
+
+    if error <= tolerance or depth >= MAX_SUBDIVISIONS:
+        return [(a, bulge)]
+
+    # Split the curve at t = 0.5 and fit each half
+    points = controls
+    halves_left, halves_right = [points[0]], [points[-1]]
+    while len(points) > 1:
+        points = (points[:-1] + points[1:]) / 2
+        halves_left.append(points[0])
+        halves_right.append(points[-1])
+    left, right = np.array(halves_left), np.array(halves_right[::-1])
+    return curve_to_arcs(left, tolerance, depth + 1) + curve_to_arcs(right, tolerance, depth + 1)
+
+
+def path_to_bulges(vertices, codes, tolerance=FLATTEN_TOLERANCE):
+    """Convert a closed path to (x, y, bulge) vertices of a closed DXF LWPOLYLINE.
+
+    Straight segments keep their end points with zero bulge; curves become
+    circular arcs within tolerance.
+    """
+    result = []
+    for code, controls in path_segments(vertices, codes):
+        if code == Path.LINETO:
+            result.append((float(controls[0][0]), float(controls[0][1]), 0.0))
+        else:
+            result.extend((float(p[0]), float(p[1]), bulge) for p, bulge in curve_to_arcs(controls, tolerance))
+    return result
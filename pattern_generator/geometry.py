@@ -0,0 +1,307 @@
+"""Pattern piece geometry, computed with NumPy and free of any UI imports."""
+import numpy as np
+from matplotlib.path import Path
+
+from .flatten import FLATTEN_TOLERANCE
+from .seam_allowance import cutting_line
+
+# Sample measurements
+sample_measurements = {
+    "chest": 100,  # cm
+    "waist": 90,  # cm
+    "shoulder_width": 46,  # cm
+    "back_length": 75,  # cm
+    "sleeve_length": 60,  # cm
+    "neck_circumference": 40,  # cm
+    "armhole_depth": 25,  # cm
+    "cuff_circumference": 20,  # cm
+    "hem_width": 110  # cm
+}
+
+# Column order of the N x 9 measurement arrays used by the batch functions
+MEASUREMENT_KEYS = list(sample_measurements)
+
+# Path codes shared by every instance of a pattern piece
+PANEL_CODES = [
+    Path.MOVETO,  # 0
+    Path.LINETO,  # 1
+    Path.LINETO,  # 2
+    Path.LINETO,  # 3
+    Path.LINETO,  # 4
+    Path.LINETO,  # 5
+    Path.LINETO,  # 6
+    Path.CURVE3,  # 7 - Neck curve control point
+    Path.CURVE3,  # Back to 0
+]
+
+SLEEVE_CODES = [
+    Path.MOVETO,  # 0
+    Path.CURVE4,  # Control point for curve
+    Path.CURVE4,  # Control point for curve
+    Path.CURVE4,  # 1
+    Path.LINETO,  # 2
+    Path.LINETO,  # 3
+    Path.LINETO,  # 4
+    Path.CURVE4,  # Control point for curve
+    Path.CURVE4,  # Control point for curve
+    Path.CURVE4,  # Back to 0
+]
+
+RECTANGLE_CODES = [
+    Path.MOVETO,  # 0
+    Path.LINETO,  # 1
+    Path.LINETO,  # 2
+    Path.LINETO,  # 3
+    Path.CLOSEPOLY  # Close the shape
+]
+
+
+def measurements_to_array(measurements):
+    """Convert a measurements dict (or a list of them) to an N x 9 array."""
+    if isinstance(measurements, dict):
+        measurements = [measurements]
+    return np.array([[m[key] for key in MEASUREMENT_KEYS] for m in measurements], dtype=float)
+
+
+def validate_measurements(measurements):
+    """Check a measurements dict and return it with every value as a float.
+
+    Raises ValueError naming the missing or invalid measurements.
+    """
+    if not isinstance(measurements, dict):
+        raise ValueError("Measurements must be a JSON object")
+    missing = [key for key in MEASUREMENT_KEYS if key not in measurements]
+    if missing:
+        raise ValueError(f"Missing measurements: {', '.join(missing)}")
+    cleaned = {}
+    for key in MEASUREMENT_KEYS:
+        value = measurements[key]
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not np.isfinite(value) or value <= 0:
+            raise ValueError(f"Measurement {key} must be a positive number, got {value!r}")
+        cleaned[key] = float(value)
+    return cleaned
+
+
+def _measurement_columns(measurement_array):
+    """Split an N x 9 measurement array into named length-N columns."""
+    measurement_array = np.atleast_2d(np.asarray(measurement_array, dtype=float))
+    if measurement_array.shape[1] != len(MEASUREMENT_KEYS):
+        raise ValueError(f"Expected {len(MEASUREMENT_KEYS)} measurement columns, "
+                         f"got {measurement_array.shape[1]}")
+    return {key: measurement_array[:, i] for i, key in enumerate(MEASUREMENT_KEYS)}
+
+
+def _stack_points(points, n):
+    """Stack a list of (x, y) column pairs into an (N, K, 2) vertex array."""
+    vertices = np.empty((n, len(points), 2))
+    for k, (x, y) in enumerate(points):
+        vertices[:, k, 0] = x
+        vertices[:, k, 1] = y
+    return vertices
+
+
+def _as_tuples(points):
+    """Convert a (K, 2) vertex array to the list of (x, y) tuples used by the scalar API."""
+    return [tuple(p) for p in points.tolist()]
+
+
+# Batch functions to generate pattern pieces for N customers at once.
+# Each returns (path_vertices, points) as (N, V, 2) and (N, K, 2) arrays.
+def _generate_panel_batch(measurement_array, chest_ease, neck_depth_divisor, neck_depth_extra):
+    """Generate front or back panels; they only differ in ease and neck depth."""
+    m = _measurement_columns(measurement_array)
+    n = len(m["chest"])
+
+    # Pattern calculations based on measurements
+    chest = m["chest"] / 2 + chest_ease  # Half chest with ease
+    shoulder = m["shoulder_width"] / 2
+    length = m["back_length"]
+    neck_width = m["neck_circumference"] / 6
+    neck_depth = m["neck_circumference"] / neck_depth_divisor + neck_depth_extra
+    armhole = m["armhole_depth"]
+    hem = m["hem_width"] / 2
+
+    # Define the points for the pattern
+    # Origin is at top left corner of the pattern
+    points = _stack_points([
+        (0, 0),  # 0: Top left (shoulder point)
+        (shoulder, 0),  # 1: Shoulder right
+        (chest, armhole),  # 2: Armhole bottom
+        (chest, length * 0.4),  # 3: Waist
+        (hem / 2 + chest / 2, length),  # 4: Hem
+        (0, length),  # 5: Left hem
+        (0, armhole),  # 6: Left armhole
+        (neck_width, neck_depth)  # 7: Neck point
+    ], n)
+
+    # The path closes the neck curve back onto point 0
+    vertices = np.concatenate([points, points[:, :1]], axis=1)
+
+    return vertices, points
+
+
+def generate_front_panel_batch(measurement_array):
+    """Generate front panels for an N x 9 measurement array."""
+    return _generate_panel_batch(measurement_array, 5, 12, 2)
+
+
+def generate_back_panel_batch(measurement_array):
+    """Generate back panels for an N x 9 measurement array."""
+    # Neck is shallower than the front
+    return _generate_panel_batch(measurement_array, 3, 24, 0)
+
+
+def generate_sleeve_batch(measurement_array):
+    """Generate sleeves for an N x 9 measurement array."""
+    m = _measurement_columns(measurement_array)
+    n = len(m["sleeve_length"])
+
+    # Pattern calculations
+    sleeve_length = m["sleeve_length"]
+    armhole = m["armhole_depth"] * 2  # Total armhole circumference
+
+    # Sleeve cap height
+    cap_height = armhole / 3
+
+    # Sleeve width at widest point (bicep)
+    sleeve_width = armhole / 2 + 5
+
+    # Define the points for the pattern
+    points = _stack_points([
+        (0, 0),  # 0: Top middle of sleeve cap
+        (sleeve_width / 2, cap_height),  # 1: Right side of sleeve
+        (sleeve_width / 3, sleeve_length),  # 2: Right cuff
+        (-sleeve_width / 3, sleeve_length),  # 3: Left cuff
+        (-sleeve_width / 2, cap_height),  # 4: Left side of sleeve
+    ], n)
+
+    # Control points for the Bézier curves of the sleeve cap
+    right_controls = _stack_points([
+        (sleeve_width / 4, cap_height / 3),  # Right control point 1
+        (sleeve_width / 2, cap_height / 1.5),  # Right control point 2
+    ], n)
+    left_controls = _stack_points([
+        (-sleeve_width / 2, cap_height / 1.5),  # Left control point 1
+        (-sleeve_width / 4, cap_height / 3),  # Left control point 2
+    ], n)
+
+    vertices = np.concatenate([
+        points[:, :1],  # Starting point
+        right_controls,
+        points[:, 1:5],  # Right sleeve point, both cuffs, left sleeve point
+        left_controls,
+        points[:, :1]  # Back to starting point
+    ], axis=1)
+
+    return vertices, points
+
+
+def _generate_rectangle_batch(length, width):
+    """Generate rectangular pieces (collar, cuff) from length-N sizes."""
+    n = len(length)
+    points = _stack_points([
+        (0, 0),  # 0: Bottom left
+        (length, 0),  # 1: Bottom right
+        (length, width),  # 2: Top right
+        (0, width)  # 3: Top left
+    ], n)
+    vertices = np.concatenate([points, points[:, :1]], axis=1)
+    return vertices, points
+
+
+def generate_collar_batch(measurement_array):
+    """Generate collars for an N x 9 measurement array."""
+    # Collar is based on neck circumference
+    m = _measurement_columns(measurement_array)
+    collar_length = m["neck_circumference"] + 2  # Add some ease
+    collar_width = 5  # Standard collar width
+    return _generate_rectangle_batch(collar_length, collar_width)
+
+
+def generate_cuff_batch(measurement_array):
+    """Generate cuffs for an N x 9 measurement array."""
+    # Cuff is based on wrist circumference
+    m = _measurement_columns(measurement_array)
+    cuff_length = m["cuff_circumference"] + 2  # Add some ease
+    cuff_width = 6  # Standard cuff width
+    return _generate_rectangle_batch(cuff_length, cuff_width)
+
+
+# Batch generator and path codes for every pattern piece, in export order
+PATTERN_PIECES = {
+    "front_panel": (generate_front_panel_batch, PANEL_CODES),
+    "back_panel": (generate_back_panel_batch, PANEL_CODES),
+    "sleeve": (generate_sleeve_batch, SLEEVE_CODES),
+    "collar": (generate_collar_batch, RECTANGLE_CODES),
+    "cuff": (generate_cuff_batch, RECTANGLE_CODES),
+}
+
+# Display titles for the pattern pieces
+PIECE_TITLES = {
+    "front_panel": "Front Panel",
+    "back_panel": "Back Panel",
+    "sleeve": "Sleeve",
+    "collar": "Collar",
+    "cuff": "Cuff",
+}
+
+
+def generate_batch(measurement_array):
+    """Generate every pattern piece for an N x 9 measurement array.
+
+    Returns a dict mapping piece name to its (N, K, 2) key point array.
+    """
+    return {name: generator(measurement_array)[1]
+            for name, (generator, _) in PATTERN_PIECES.items()}
+
+
+# Functions to generate pattern pieces
+def _generate_single(name, measurements):
+    """Generate one piece for one measurements dict through the batch engine."""
+    generator, codes = PATTERN_PIECES[name]
+    vertices, points = generator(measurements_to_array(measurements))
+    return Path(vertices[0], codes), _as_tuples(points[0])
+
+
+def generate_front_panel(measurements):
+    """Generate the front panel pattern piece."""
+    return _generate_single("front_panel", measurements)
+
+
+def generate_back_panel(measurements):
+    """Generate the back panel pattern piece."""
+    return _generate_single("back_panel", measurements)
+
+
+def generate_sleeve(measurements):
+    """Generate the sleeve pattern piece."""
+    return _generate_single("sleeve", measurements)
+
+
+def generate_collar(measurements):
+    """Generate the collar pattern piece."""
+    return _generate_single("collar", measurements)
+
+
+def generate_cuff(measurements):
+    """Generate the cuff pattern piece."""
+    return _generate_single("cuff", measurements)
+
+
+def build_patterns(measurements, allowances=None, join="mitre", tolerance=FLATTEN_TOLERANCE):
+    """Generate all pattern pieces for one measurements dict without plotting.
+
+    Returns a list of dicts with the piece name, title, path and points, in
+    the order used for display and export. Each dict also holds the
+    flattened stitching line ("outline") and the seam-allowance cutting line
+    ("cutting_line"), computed once here and shared by the preview and DXF.
+    allowances, join and tolerance are passed to cutting_line.
+    """
+    patterns = []
+    for name in PATTERN_PIECES:
+        path, points = _generate_single(name, measurements)
+        outline, cutting = cutting_line(name, path.vertices, path.codes, join=join, tolerance=tolerance,
+                                       allowances=allowances)
+        patterns.append({"name": name, "title": PIECE_TITLES[name], "path": path, "points": points,
+                         "outline": outline, "cutting_line": cutting})
+    return patterns
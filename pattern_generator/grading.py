@@ -0,0 +1,155 @@
+"""Size grading: a whole size run computed in one vectorized pass."""
+import io
+
+import ezdxf
+import numpy as np
+
+from .dxf_export import _open_zip, _serialize
+from .flatten import FLATTEN_TOLERANCE, flatten_path_batch
+from .geometry import MEASUREMENT_KEYS, PATTERN_PIECES, measurements_to_array
+
+# Size run and base size used when no grade rules are supplied
+STANDARD_SIZES = ["XS", "S", "M", "L", "XL", "2XL", "3XL", "4XL", "5XL"]
+STANDARD_BASE_SIZE = "M"
+
+# Change in each measurement (cm) per size step
+STANDARD_GRADE_STEP = {
+    "chest": 4,
+    "waist": 4,
+    "shoulder_width": 1.2,
+    "back_length": 1,
+    "sleeve_length": 0.5,
+    "neck_circumference": 1,
+    "armhole_depth": 0.6,
+    "cuff_circumference": 0.5,
+    "hem_width": 4
+}
+
+
+def make_grade_rules(sizes=STANDARD_SIZES, base_size=STANDARD_BASE_SIZE, step=STANDARD_GRADE_STEP):
+    """Build per-size grade rules from a constant per-step increment.
+
+    Returns a dict mapping each size to its measurement deltas from the base size.
+    """
+    base_index = sizes.index(base_size)
+    return {size: {key: delta * (i - base_index) for key, delta in step.items()}
+            for i, size in enumerate(sizes)}
+
+
+def grade_measurements(base_measurements, grade_rules):
+    """Apply grade rules to a base size.
+
+    grade_rules maps size name to a dict of deltas (missing keys mean no
+    change). Returns the list of sizes and an S x 9 measurement array.
+    """
+    sizes = list(grade_rules)
+    deltas = np.array([[grade_rules[size].get(key, 0) for key in MEASUREMENT_KEYS] for size in sizes],
+                      dtype=float)
+    unknown = {key for rules in grade_rules.values() for key in rules} - set(MEASUREMENT_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown measurements in grade rules: {sorted(unknown)}")
+    return sizes, measurements_to_array(base_measurements) + deltas
+
+
+def generate_graded_nest(base_measurements, grade_rules=None, tolerance=FLATTEN_TOLERANCE):
+    """Generate every piece in every size.
+
+    Returns the list of sizes and a dict mapping piece name to its (S, V, 2)
+    path vertices, (S, K, 2) key points, path codes and the list of S
+    flattened outlines.
+    """
+    if grade_rules is None:
+        grade_rules = make_grade_rules()
+    sizes, measurement_array = grade_measurements(base_measurements, grade_rules)
+    nest = {}
+    for name, (generator, codes) in PATTERN_PIECES.items():
+        vertices, points = generator(measurement_array)
+        outlines = [outline for outline, _ in flatten_path_batch(vertices, codes, tolerance)]
+        nest[name] = {"vertices": vertices, "points": points, "codes": codes, "outlines": outlines}
+    return sizes, nest
+
+
+def _graded_document(sizes):
+    """Create a document with one SIZE_<size> layer per size and a TEXT layer."""
+    doc = ezdxf.new('R2010')
+    for i, size in enumerate(sizes):
+        color = i % 6 + 1  # Cycle through the basic AutoCAD colors
+        doc.layers.new(name=f"SIZE_{size}", dxfattribs={'color': color})
+    doc.layers.new(name='TEXT', dxfattribs={'color': 3})
+    return doc
+
+
+def _add_size_outline(layout, size, outline, layer):
+    """Add one size's closed outline and its size label to a layout or block."""
+    layout.add_lwpolyline(outline.tolist(), close=True, dxfattribs={'layer': layer})
+    # Label each size next to its last point so nested outlines stay readable
+    x, y = outline[-1]
+    layout.add_text(size, dxfattribs={'height': 0.8, 'layer': layer, 'insert': (float(x) + 0.6, float(y))})
+
+
+def _add_nest_title(msp, piece_name, sizes, outlines, x=0.0):
+    """Add the piece's graded-nest title above its tallest outline."""
+    msp.add_text(f"{piece_name.upper()} GRADED NEST {sizes[0]}-{sizes[-1]}", dxfattribs={
+        'height': 2.0,
+        'layer': 'TEXT',
+        'color': 2,
+        'insert': (x, max(float(outline[:, 1].max()) for outline in outlines) + 5)
+    })
+
+
+def generate_graded_nest_dxf(piece_name, sizes, outlines, fmt="asc"):
+    """Generate a DXF with every size of one piece stacked on a common origin.
+
+    outlines holds one (M, 2) polygon per size; sizes may have different vertex counts.
+    Each size is drawn on its own SIZE_<size> layer so cutters can toggle sizes.
+    Returns text, or bytes for binary DXF (fmt="bin").
+    """
+    outlines = [np.asarray(outline) for outline in outlines]
+    doc = _graded_document(sizes)
+    msp = doc.modelspace()
+    for size, outline in zip(sizes, outlines):
+        _add_size_outline(msp, size, outline, f"SIZE_{size}")
+    _add_nest_title(msp, piece_name, sizes, outlines)
+    return _serialize(doc, fmt)
+
+
+def create_graded_nest_zip(base_measurements, grade_rules=None, fmt="asc", compression="default"):
+    """Create a ZIP with one stacked graded-nest DXF per pattern piece.
+
+    compression is one of COMPRESSION_PROFILES (see dxf_export).
+    """
+    sizes, nest = generate_graded_nest(base_measurements, grade_rules)
+    zip_buffer = io.BytesIO()
+    with _open_zip(zip_buffer, compression) as zip_file:
+        for name, piece in nest.items():
+            zip_file.writestr(f"{name}_graded.dxf", generate_graded_nest_dxf(name, sizes, piece["outlines"], fmt))
+
+    zip_buffer.seek(0)
+    return zip_buffer
+
+
+def generate_graded_block_dxf(base_measurements, grade_rules=None, spacing=10.0, fmt="asc"):
+    """Generate one DXF holding every piece in every size as blocks.
+
+    Each piece/size outline is a BLOCK named <PIECE>_<size> and is placed by
+    an INSERT on its SIZE_<size> layer, so the whole graded set shares one
+    header and set of tables. Each piece's sizes stack on a common origin,
+    as in generate_graded_nest_dxf, and the pieces sit side by side along x,
+    spacing cm apart. Returns text, or bytes for binary DXF (fmt="bin").
+    """
+    sizes, nest = generate_graded_nest(base_measurements, grade_rules)
+    doc = _graded_document(sizes)
+    msp = doc.modelspace()
+
+    x = 0.0
+    for name, piece in nest.items():
+        outlines = [np.asarray(outline) for outline in piece["outlines"]]
+        for size, outline in zip(sizes, outlines):
+            # Block entities on layer 0 take the layer of each INSERT
+            block = doc.blocks.new(name=f"{name.upper()}_{size}")
+            _add_size_outline(block, size, outline, '0')
+            msp.add_blockref(block.name, (x, 0), dxfattribs={'layer': f"SIZE_{size}"})
+        _add_nest_title(msp, name, sizes, outlines, x)
+        x += max(float(outline[:, 0].max()) for outline in outlines) + spacing
+
+    return _serialize(doc, fmt)
@@ -0,0 +1,61 @@
+"""HPGL/PLT output for feeding cutters and pen plotters directly."""
+import numpy as np
+
+# HPGL plotter units: 40 per millimetre
+UNITS_PER_CM = 400
+
+
+def plan_pen_path(polygons, start=(0.0, 0.0)):
+    """Order closed polygons to reduce pen-up travel (nearest-neighbour tour).
+
+    Yields each polygon rotated to begin at the vertex closest to the pen,
+    which is where the previous polygon ended. The tour is built lazily, so
+    commands can be sent while later pieces are still being chosen.
+    """
+    remaining = [np.asarray(polygon, dtype=float) for polygon in polygons]
+    position = np.asarray(start, dtype=float)
+    while remaining:
+        # Distance from the pen to every vertex of every remaining polygon at once
+        vertices = np.vstack(remaining)
+        owners = np.repeat(np.arange(len(remaining)), [len(polygon) for polygon in remaining])
+        nearest = int(np.argmin(np.einsum("ij,ij->i", vertices - position, vertices - position)))
+        index = owners[nearest]
+        first = nearest - np.searchsorted(owners, index)
+
+        polygon = np.roll(remaining.pop(index), -first, axis=0)
+        position = polygon[0]  # Closed outlines finish where they started
+        yield polygon
+
+
+def pen_up_travel(polygons, start=(0.0, 0.0)):
+    """Return the total pen-up distance (cm) for drawing polygons in the given order."""
+    position = np.asarray(start, dtype=float)
+    total = 0.0
+    for polygon in polygons:
+        total += float(np.linalg.norm(polygon[0] - position))
+        position = polygon[0]
+    return total
+
+
+def iter_hpgl(polygons, pen=1, optimize=True):
+    """Yield HPGL commands drawing each closed polygon (coordinates in cm)."""
+    yield "IN;"
+    yield f"SP{pen};"
+    ordered = plan_pen_path(polygons) if optimize else (np.asarray(p, dtype=float) for p in polygons)
+    for polygon in ordered:
+        units = np.round(np.vstack([polygon, polygon[:1]]) * UNITS_PER_CM).astype(int)
+        yield f"PU{units[0][0]},{units[0][1]};"
+        yield "PD" + ",".join(f"{x},{y}" for x, y in units[1:]) + ";"
+    yield "PU;"
+    yield "SP0;"
+
+
+def write_hpgl(polygons, stream, pen=1, optimize=True):
+    """Stream HPGL for the polygons to a text stream, one command per line."""
+    for command in iter_hpgl(polygons, pen, optimize):
+        stream.write(command + "\n")
+
+
+def write_marker_hpgl(marker, stream, pen=1):
+    """Stream the placed pieces of a marker (see nesting.make_marker) as HPGL."""
+    write_hpgl((placed["polygon"] for placed in marker["placements"]), stream, pen)
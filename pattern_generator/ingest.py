@@ -0,0 +1,186 @@
+"""Streaming ingestion of CSV and JSONL measurement files into NumPy blocks."""
+import csv
+import io
+import json
+import operator
+import os
+
+import numpy as np
+
+from .geometry import MEASUREMENT_KEYS, generate_batch
+
+# Rows parsed into each measurement block
+CHUNK_SIZE = 4096
+
+# Column or field holding the order id; rows without one are numbered from 1
+ID_FIELD = "order_id"
+
+
+def _open_text(source):
+    """Return (text file, owned) for a path or an open text/binary file.
+
+    owned is "close" for files opened here, "detach" for a wrapper around
+    the caller's binary file and None for the caller's own text file.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, "r", encoding="utf-8", newline=""), "close"
+    if isinstance(source.read(0), bytes):
+        return io.TextIOWrapper(source, encoding="utf-8", newline=""), "detach"
+    return source, None
+
+
+def _detect_format(source, fmt):
+    if fmt is not None:
+        return fmt
+    name = source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "")
+    return "jsonl" if str(name).lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _to_block(rows):
+    """Convert a list of 9-value rows to an (n, 9) float array, NaN where a value is unparseable."""
+    try:
+        return np.array(rows, dtype=float)
+    except (TypeError, ValueError):
+        # Only chunks holding a bad value pay for per-value conversion
+        return np.array([[_number(value) for value in row] for row in rows], dtype=float)
+
+
+def _iter_rows(text, fmt):
+    """Yield (line number, order_id or None, 9 values, parse error or None) for each record."""
+    if fmt == "csv":
+        reader = csv.reader(text)
+        header = [name.strip() for name in next(reader, [])]
+        if not header:
+            return
+        missing = [key for key in MEASUREMENT_KEYS if key not in header]
+        if missing:
+            raise ValueError(f"CSV header is missing measurement columns: {', '.join(missing)}")
+        columns = [header.index(key) for key in MEASUREMENT_KEYS]
+        id_column = header.index(ID_FIELD) if ID_FIELD in header else None
+        pick = operator.itemgetter(*columns)
+        for row in reader:
+            if not row:
+                continue
+            if len(row) >= len(header):
+                values = pick(row)
+            else:
+                values = [row[c] if c < len(row) else None for c in columns]
+            yield (reader.line_num,
+                   row[id_column] if id_column is not None and id_column < len(row) else None,
+                   values,
+                   None)
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(text, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, None, [None] * len(MEASUREMENT_KEYS), f"invalid JSON: {e.msg}"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, [None] * len(MEASUREMENT_KEYS), "expected a JSON object"
+                continue
+            yield line_number, record.get(ID_FIELD), [record.get(key) for key in MEASUREMENT_KEYS], None
+    else:
+        raise ValueError(f"Unknown measurement file format {fmt!r}, expected 'csv' or 'jsonl'")
+
+
+def _rejection(row):
+    """Return why a measurement row fails validate_block."""
+    for key, value in zip(MEASUREMENT_KEYS, row):
+        if np.isnan(value):
+            return f"{key} is missing or not a number"
+        if not (np.isfinite(value) and value > 0):
+            return f"{key} must be a finite positive number, got {value}"
+    return "invalid measurements"
+
+
+def _report_rejections(block, ids, lines, errors, rejected, strict):
+    """Append or raise a (line number, order_id, reason) entry for each invalid row of block."""
+    for i in np.flatnonzero(~validate_block(block)):
+        reason = errors.get(i) or _rejection(block[i])
+        if strict:
+            raise ValueError(f"Line {lines[i]} (order {ids[i]}): {reason}")
+        rejected.append((lines[i], ids[i], reason))
+
+
+def iter_measurement_blocks(source, chunk_size=CHUNK_SIZE, fmt=None, rejected=None, strict=False):
+    """Parse a CSV or JSONL measurement file incrementally.
+
+    source is a path or an open file; fmt defaults from the file extension.
+    Yields (order_ids, block) pairs where block is an (n, 9) float array in
+    MEASUREMENT_KEYS order, with NaN for missing or unparseable values.
+    Only one block is held in memory at a time.
+
+    Rows that fail validate_block are kept in the block but reported:
+    appended to rejected as (line number, order_id, reason) tuples when a
+    list is given, or raised as ValueError when strict is true.
+    """
+    fmt = _detect_format(source, fmt)
+    text, owned = _open_text(source)
+
+    try:
+        rows, ids, lines, errors = [], [], [], {}
+        row_number = 0
+        for line_number, order_id, values, error in _iter_rows(text, fmt):
+            row_number += 1
+            if error is not None:
+                errors[len(rows)] = error
+            rows.append(values)
+            ids.append(str(order_id) if order_id not in (None, "") else str(row_number))
+            lines.append(line_number)
+            if len(rows) == chunk_size:
+                block = _to_block(rows)
+                if rejected is not None or strict:
+                    _report_rejections(block, ids, lines, errors, rejected, strict)
+                yield ids, block
+                rows, ids, lines, errors = [], [], [], {}
+        if rows:
+            block = _to_block(rows)
+            if rejected is not None or strict:
+                _report_rejections(block, ids, lines, errors, rejected, strict)
+            yield ids, block
+    finally:
+        if owned == "close":
+            text.close()
+        elif owned == "detach":
+            # Leave the caller's binary file open
+            text.detach()
+
+
+def validate_block(block):
+    """Return a boolean mask of rows whose measurements are all finite and positive."""
+    return np.all(np.isfinite(block) & (block > 0), axis=1)
+
+
+def iter_pattern_batches(source, chunk_size=CHUNK_SIZE, fmt=None, rejected=None, strict=False):
+    """Stream a measurement file through the batch generators chunk by chunk.
+
+    Yields (order_ids, valid, pieces) where valid masks the rows that passed
+    validation, and pieces maps piece name to (n_valid, K, 2) point arrays
+    for the valid rows (see generate_batch). rejected and strict are as for
+    iter_measurement_blocks.
+    """
+    for ids, block in iter_measurement_blocks(source, chunk_size, fmt, rejected, strict):
+        valid = validate_block(block)
+        yield ids, valid, generate_batch(block[valid])
+
+
+def iter_orders(source, chunk_size=CHUNK_SIZE, fmt=None, rejected=None, strict=False):
+    """Yield (order_id, measurements dict) for each valid row, e.g. for JobQueue.submit.
+
+    Skipped rows are reported through rejected or strict as for iter_measurement_blocks.
+    """
+    for ids, block in iter_measurement_blocks(source, chunk_size, fmt, rejected, strict):
+        valid = validate_block(block)
+        for order_id, row in zip(np.asarray(ids)[valid], block[valid].tolist()):
+            yield str(order_id), dict(zip(MEASUREMENT_KEYS, row))
@@ -0,0 +1,241 @@
+"""SQLite-backed job queue for large batch DXF exports.
+
+Submit a job with ``JobQueue(db_path).submit(orders)``, then run one or more
+workers with ``python -m pattern_generator.jobs worker <db_path>``. Each
+piece is exported to its own file and recorded as done, so a worker that
+crashes or is killed resumes without regenerating finished pieces.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+from .geometry import PATTERN_PIECES, build_patterns, validate_measurements
+from .dxf_export import COMPRESSION_PROFILES, write_dxf, _export_job, _open_zip
+
+# Seconds after which a job claimed by a worker that stopped updating it may be reclaimed
+STALE_AFTER = 300
+
+# Seconds between heartbeat updates while a job's archive is being written
+PACKAGE_HEARTBEAT = 10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    output_dir TEXT NOT NULL,
+    compression TEXT NOT NULL DEFAULT 'default',
+    created REAL NOT NULL,
+    heartbeat REAL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS pieces (
+    job_id INTEGER NOT NULL REFERENCES jobs(id),
+    order_id TEXT NOT NULL,
+    measurements TEXT NOT NULL,
+    piece TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (job_id, order_id, piece)
+);
+"""
+
+
+class JobQueue:
+    """Batch export jobs and their per-piece progress, stored in one SQLite file."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(_SCHEMA)
+        # Queues created before compression profiles were stored per job
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(jobs)")}
+        if "compression" not in columns:
+            self.connection.execute("ALTER TABLE jobs ADD COLUMN compression TEXT NOT NULL DEFAULT 'default'")
+
+    def submit(self, orders, output_dir, compression="default"):
+        """Queue a job for (order_id, measurements) pairs and return its id.
+
+        compression is the COMPRESSION_PROFILES entry used for the job's archive.
+        """
+        if compression not in COMPRESSION_PROFILES:
+            raise ValueError(f"Unknown compression profile {compression!r}, "
+                             f"expected one of {tuple(COMPRESSION_PROFILES)}")
+        rows = [(_check_order_id(str(order_id)), json.dumps(validate_measurements(measurements)))
+                for order_id, measurements in orders]
+        with self._transaction():
+            job_id = self.connection.execute(
+                "INSERT INTO jobs (output_dir, compression, created) VALUES (?, ?, ?)",
+                (output_dir, compression, time.time())).lastrowid
+            self.connection.executemany(
+                "INSERT INTO pieces (job_id, order_id, measurements, piece) VALUES (?, ?, ?, ?)",
+                [(job_id, order_id, measurements, piece) for order_id, measurements in rows
+                 for piece in PATTERN_PIECES])
+        return job_id
+
+    def progress(self, job_id):
+        """Return the job status with done and total piece counts."""
+        row = self.connection.execute("SELECT status, error FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"No job with id {job_id}")
+        status, error = row
+        done, total = self.connection.execute(
+            "SELECT COALESCE(SUM(done), 0), COUNT(*) FROM pieces WHERE job_id = ?", (job_id,)).fetchone()
+        return {"job_id": job_id, "status": status, "done": done, "total": total, "error": error}
+
+    def claim(self):
+        """Claim the oldest pending (or stale running) job for this worker, or return None."""
+        with self._transaction():
+            row = self.connection.execute(
+                "SELECT id FROM jobs WHERE status = 'pending' OR (status = 'running' AND heartbeat < ?) "
+                "ORDER BY id LIMIT 1", (time.time() - STALE_AFTER,)).fetchone()
+            if row is None:
+                return None
+            self.connection.execute("UPDATE jobs SET status = 'running', heartbeat = ? WHERE id = ?",
+                                    (time.time(), row[0]))
+        return row[0]
+
+    def run_job(self, job_id, progress_callback=None, compression=None):
+        """Export every unfinished piece of a job, then package the archive.
+
+        compression overrides the profile the job was submitted with.
+        """
+        output_dir, job_compression = self.connection.execute(
+            "SELECT output_dir, compression FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        pieces_dir = os.path.join(output_dir, "pieces")
+        try:
+            rows = self.connection.execute(
+                "SELECT order_id, measurements, piece, done FROM pieces WHERE job_id = ? ORDER BY rowid",
+                (job_id,)).fetchall()
+            # Finished pieces are skipped, unless their file was lost since
+            finished = [done and os.path.exists(os.path.join(pieces_dir, order_id, f"{piece}.dxf"))
+                        for order_id, _, piece, done in rows]
+            # Counted once here and kept up to date in memory rather than re-counted per piece
+            progress = {"job_id": job_id, "status": "running", "done": sum(finished), "total": len(rows),
+                        "error": None}
+            patterns_by_order = {}
+            for (order_id, measurements, piece, _), skip in zip(rows, finished):
+                if skip:
+                    continue
+                # Generate each order's pieces once and export them one at a time
+                if order_id not in patterns_by_order:
+                    patterns_by_order.clear()
+                    patterns_by_order[order_id] = {
+                        pattern["name"]: pattern for pattern in build_patterns(json.loads(measurements))}
+                self._export_piece(pieces_dir, order_id, patterns_by_order[order_id][piece])
+                self.connection.execute(
+                    "UPDATE pieces SET done = 1 WHERE job_id = ? AND order_id = ? AND piece = ?",
+                    (job_id, order_id, piece))
+                self._heartbeat(job_id)
+                progress["done"] += 1
+                if progress_callback is not None:
+                    progress_callback(dict(progress))
+
+            self._package(job_id, output_dir, pieces_dir, compression or job_compression)
+            self.connection.execute("UPDATE jobs SET status = 'done', error = NULL WHERE id = ?", (job_id,))
+        except Exception as e:
+            self.connection.execute("UPDATE jobs SET status = 'failed', error = ? WHERE id = ?", (str(e), job_id))
+            raise
+
+    def _export_piece(self, pieces_dir, order_id, pattern):
+        """Write one piece's DXF atomically so a crash never leaves a half-written file marked done."""
+        path = os.path.join(pieces_dir, order_id, f"{pattern['name']}.dxf")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        points, filename, options = _export_job(pattern, writer="fast")
+        with open(path + ".tmp", "w", encoding="utf-8", newline="") as f:
+            write_dxf(points, filename, f, **options)
+        os.replace(path + ".tmp", path)
+
+    def _package(self, job_id, output_dir, pieces_dir, compression="default"):
+        """Combine the finished piece files into output_dir/job_<id>.zip."""
+        rows = self.connection.execute(
+            "SELECT order_id, piece FROM pieces WHERE job_id = ? ORDER BY rowid", (job_id,)).fetchall()
+        archive = os.path.join(output_dir, f"job_{job_id}.zip")
+        last_beat = time.monotonic()
+        with _open_zip(archive + ".tmp", compression) as zip_file:
+            for order_id, piece in rows:
+                zip_file.write(os.path.join(pieces_dir, order_id, f"{piece}.dxf"), f"{order_id}/{piece}.dxf")
+                # Slow profiles can take longer than STALE_AFTER; keep the claim alive
+                if time.monotonic() - last_beat >= PACKAGE_HEARTBEAT:
+                    self._heartbeat(job_id)
+                    last_beat = time.monotonic()
+        os.replace(archive + ".tmp", archive)
+
+    def _heartbeat(self, job_id):
+        self.connection.execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time(), job_id))
+
+    def _transaction(self):
+        return _Transaction(self.connection)
+
+
+def _check_order_id(order_id):
+    """Return order_id if it is safe to use as a directory name, else raise ValueError."""
+    if (order_id in ("", ".") or ".." in order_id or os.path.isabs(order_id)
+            or os.path.splitdrive(order_id)[0]
+            or any(sep in order_id for sep in {"/", "\\", os.sep, os.altsep} - {None})):
+        raise ValueError(f"Invalid order id {order_id!r}: must be a plain name without path separators or '..'")
+    return order_id
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, so only one worker claims a job."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def run_worker(db_path, poll_interval=1.0, once=False):
+    """Process queued jobs until interrupted (or until the queue is empty with once=True)."""
+    queue = JobQueue(db_path)
+    while True:
+        job_id = queue.claim()
+        if job_id is None:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+        try:
+            queue.run_job(job_id, lambda p: print(f"job {p['job_id']}: {p['done']}/{p['total']}", flush=True))
+        except Exception as e:
+            print(f"job {job_id} failed: {e}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch DXF export jobs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    submit = commands.add_parser("submit", help="queue a JSON file mapping order id to measurements")
+    submit.add_argument("db")
+    submit.add_argument("orders", help="JSON object mapping order id to measurements")
+    submit.add_argument("output_dir")
+    submit.add_argument("--compression", choices=tuple(COMPRESSION_PROFILES), default="default",
+                        help="ZIP compression profile for the job archive")
+    worker = commands.add_parser("worker", help="process queued jobs")
+    worker.add_argument("db")
+    worker.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    status = commands.add_parser("status", help="show job progress")
+    status.add_argument("db")
+    status.add_argument("job_id", type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == "submit":
+        with open(args.orders) as f:
+            orders = json.load(f)
+        print(JobQueue(args.db).submit(orders.items(), args.output_dir, args.compression))
+    elif args.command == "worker":
+        run_worker(args.db, once=args.once)
+    else:
+        try:
+            print(json.dumps(JobQueue(args.db).progress(args.job_id)))
+        except ValueError as e:
+            parser.exit(1, f"{e}\n")
+
+
+if __name__ == "__main__":
+    main()
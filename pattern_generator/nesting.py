@@ -0,0 +1,254 @@
+"""Marker making: nesting pattern pieces onto a fabric width.
+
+The marker runs along the fabric: x is the marker length and y is across
+the fabric width, so the selvage is parallel to the x axis.
+"""
+import bisect
+import random
+import time
+
+import ezdxf
+import numpy as np
+
+from .dxf_export import _serialize
+from .spatial_index import GridIndex, signed_area
+
+# Number of copies of each piece cut for one shirt
+MARKER_QUANTITIES = {
+    "front_panel": 1,
+    "back_panel": 1,
+    "sleeve": 2,
+    "collar": 1,
+    "cuff": 2,
+}
+
+# Allowed rotations (degrees) that keep each piece's grain line parallel to the selvage.
+# Body pieces and sleeves run lengthwise along the pattern y axis; collar and cuff along x.
+GRAIN_ROTATIONS = {
+    "front_panel": (90, 270),
+    "back_panel": (90, 270),
+    "sleeve": (90, 270),
+    "collar": (0, 180),
+    "cuff": (0, 180),
+}
+
+
+def _rotation_matrix(degrees):
+    theta = np.radians(degrees)
+    return np.array([[np.cos(theta), -np.sin(theta)], [np.sin(theta), np.cos(theta)]])
+
+
+def rotate_polygon(polygon, degrees):
+    """Rotate a polygon about the origin and shift its bounding box to start at (0, 0)."""
+    rotated = polygon @ _rotation_matrix(degrees).T
+    return rotated - rotated.min(axis=0)
+
+
+def _nest_polygon(pattern):
+    """Return the polygon a piece is nested by: its cutting line when known."""
+    # Pieces are cut along the seam allowance, so nest the cutting line when known
+    polygon = pattern.get("cutting_line")
+    if polygon is None:
+        polygon = pattern.get("outline", pattern["points"])
+    return np.asarray(polygon, dtype=float)
+
+
+def _marker_pieces(patterns, quantities, rotations):
+    """Expand patterns into one entry per cut piece with its allowed rotated shapes."""
+    pieces = []
+    for pattern in patterns:
+        polygon = _nest_polygon(pattern)
+        for copy in range(quantities.get(pattern["name"], 1)):
+            shapes = [(angle, rotate_polygon(polygon, angle))
+                      for angle in rotations.get(pattern["name"], (0,))]
+            pieces.append({"name": pattern["name"], "copy": copy, "shapes": shapes,
+                           "area": abs(signed_area(polygon))})
+    return pieces
+
+
+def _bottom_left_fill(pieces, fabric_width, spacing):
+    """Place pieces in the given order at the lowest-x, then lowest-y free position.
+
+    Candidate x positions are 0 and the right edges of placed pieces; at each
+    x the candidate y positions are 0 and the tops of placed pieces in the
+    vertical band the piece would cover. A shape that fails at some x is not
+    tried there again until a new piece lands in that band, so positions
+    behind the filled part of the marker stop costing collision tests.
+    """
+    placements = []
+    # Cells about the size of a small piece keep each collision query to a few neighbours
+    index = GridIndex(cell_size=max(fabric_width / 8, 1.0))
+    max_width = max((float(shape[:, 0].max()) for piece in pieces for _, shape in piece["shapes"]), default=0.0)
+    xs = [0.0]
+    # x -> number of placements when a piece last landed in its band
+    touched = {0.0: 0}
+    # (piece name, rotation, x) -> touched[x] when that shape last failed at x
+    failed = {}
+    for piece in pieces:
+        best = None
+        for angle, shape in piece["shapes"]:
+            width, height = (float(v) for v in shape.max(axis=0))
+            if height > fabric_width:
+                continue
+            for x in xs:
+                if best is not None and x > best[0]:
+                    break
+                key = (piece["name"], angle, x)
+                if failed.get(key) == touched[x]:
+                    continue
+                band = (x - spacing, 0.0, x + width + spacing, fabric_width)
+                ys = {0.0} | {placements[i]["box"][3] + spacing for i in index.candidates(band)}
+                fits = False
+                for y in sorted(ys):
+                    if y + height > fabric_width:
+                        break
+                    candidate = shape + (x, y)
+                    if not index.collides(candidate, spacing):
+                        if best is None or (x, y) < best[:2]:
+                            best = (x, y, angle, candidate, (x, y, x + width, y + height))
+                        fits = True
+                        break
+                if not fits:
+                    failed[key] = touched[x]
+        if best is None:
+            raise ValueError(f"{piece['name']} does not fit on a {fabric_width} cm fabric width")
+
+        x, y, angle, polygon, box = best
+        index.insert(polygon)
+        placements.append({"name": piece["name"], "copy": piece["copy"], "rotation": angle,
+                           "offset": (x, y), "polygon": polygon, "box": box})
+        new_x = box[2] + spacing
+        if new_x not in touched:
+            bisect.insort(xs, new_x)
+        # Every x whose band the new piece reaches may now have new positions or collisions
+        lo = bisect.bisect_left(xs, box[0] - max_width - 2 * spacing)
+        hi = bisect.bisect_right(xs, box[2] + spacing)
+        for touched_x in xs[lo:hi]:
+            touched[touched_x] = len(placements)
+        touched[new_x] = len(placements)
+    return placements
+
+
+def _marker_length(placements):
+    return max(placed["box"][2] for placed in placements)
+
+
+def make_marker(patterns, fabric_width=150, spacing=0.5, quantities=MARKER_QUANTITIES,
+                rotations=GRAIN_ROTATIONS, optimize=False, time_limit=5.0, seed=None):
+    """Nest pattern pieces onto a fabric width.
+
+    The fast mode runs bottom-left-fill once with pieces sorted by decreasing
+    area. With optimize=True, piece orders are perturbed by random swaps for
+    up to time_limit seconds and the shortest marker found is kept.
+
+    Returns a dict with the fabric width, marker length, a list of
+    placements (piece name, copy, rotation, offset and placed polygon) and
+    the unrotated shape of each piece by name.
+    """
+    patterns = list(patterns)
+    pieces = _marker_pieces(patterns, quantities, rotations)
+    order = sorted(pieces, key=lambda piece: piece["area"], reverse=True)
+    placements = _bottom_left_fill(order, fabric_width, spacing)
+
+    if optimize:
+        rng = random.Random(seed)
+        deadline = time.monotonic() + time_limit
+        best_length = _marker_length(placements)
+        while time.monotonic() < deadline and len(order) > 1:
+            trial = list(order)
+            i, j = rng.sample(range(len(trial)), 2)
+            trial[i], trial[j] = trial[j], trial[i]
+            trial_placements = _bottom_left_fill(trial, fabric_width, spacing)
+            trial_length = _marker_length(trial_placements)
+            if trial_length <= best_length:
+                order, placements, best_length = trial, trial_placements, trial_length
+
+    return {
+        "fabric_width": fabric_width,
+        "length": float(_marker_length(placements)),
+        "placements": placements,
+        "shapes": {pattern["name"]: _nest_polygon(pattern) for pattern in patterns},
+    }
+
+
+def marker_report(marker):
+    """Return the yield report for a marker: lengths, areas and fabric efficiency."""
+    piece_area = float(sum(abs(signed_area(placed["polygon"])) for placed in marker["placements"]))
+    fabric_area = float(marker["fabric_width"] * marker["length"])
+    return {
+        "fabric_width_cm": marker["fabric_width"],
+        "marker_length_cm": round(marker["length"], 2),
+        "fabric_area_cm2": round(fabric_area, 2),
+        "piece_area_cm2": round(piece_area, 2),
+        "efficiency_percent": round(100 * piece_area / fabric_area, 2) if fabric_area else 0.0,
+        "pieces": len(marker["placements"]),
+    }
+
+
+def _marker_document(marker):
+    """Create the marker document with its layers, fabric boundary, piece labels and report."""
+    doc = ezdxf.new('R2010')
+    doc.layers.new(name='FABRIC', dxfattribs={'color': 8})  # Color 8 = grey
+    doc.layers.new(name='PATTERN_OUTLINE', dxfattribs={'color': 1})  # Color 1 = red
+    doc.layers.new(name='TEXT', dxfattribs={'color': 3})  # Color 3 = green
+    msp = doc.modelspace()
+
+    # Fabric boundary: marker length along x, fabric width along y
+    length, width = marker["length"], marker["fabric_width"]
+    msp.add_lwpolyline([(0, 0), (length, 0), (length, width), (0, width)],
+                       close=True, dxfattribs={'layer': 'FABRIC'})
+
+    for placed in marker["placements"]:
+        center = placed["polygon"].mean(axis=0)
+        msp.add_text(f"{placed['name'].upper()} {placed['copy'] + 1}", dxfattribs={
+            'height': 1.5,
+            'layer': 'TEXT',
+            'insert': (float(center[0]), float(center[1]))
+        })
+
+    report = marker_report(marker)
+    msp.add_text(f"MARKER {report['marker_length_cm']}cm x {width}cm, "
+                 f"EFFICIENCY {report['efficiency_percent']}%", dxfattribs={
+                     'height': 2.0,
+                     'layer': 'TEXT',
+                     'color': 2,
+                     'insert': (0, -5)
+                 })
+    return doc
+
+
+def generate_marker_dxf(marker, fmt="asc"):
+    """Generate a single DXF with the fabric boundary and every placed piece.
+
+    Returns text, or bytes for binary DXF (fmt="bin").
+    """
+    doc = _marker_document(marker)
+    msp = doc.modelspace()
+    for placed in marker["placements"]:
+        msp.add_lwpolyline(placed["polygon"].tolist(), close=True, dxfattribs={'layer': 'PATTERN_OUTLINE'})
+    return _serialize(doc, fmt)
+
+
+def generate_marker_block_dxf(marker, fmt="asc"):
+    """Generate the marker DXF with each piece defined once as a BLOCK.
+
+    Every placement is an INSERT of its piece's block, rotated and moved to
+    where the piece was nested, so copies share one outline definition.
+    Returns text, or bytes for binary DXF (fmt="bin").
+    """
+    doc = _marker_document(marker)
+    msp = doc.modelspace()
+    for name, shape in marker["shapes"].items():
+        # Block entities on layer 0 take the layer of each INSERT
+        block = doc.blocks.new(name=name.upper())
+        block.add_lwpolyline(shape.tolist(), close=True, dxfattribs={'layer': '0'})
+
+    for placed in marker["placements"]:
+        # The placed polygon is the shape rotated about the origin plus a translation
+        shape = marker["shapes"][placed["name"]]
+        insert = placed["polygon"][0] - _rotation_matrix(placed["rotation"]) @ shape[0]
+        msp.add_blockref(placed["name"].upper(), (float(insert[0]), float(insert[1])), dxfattribs={
+            'layer': 'PATTERN_OUTLINE',
+            'rotation': float(placed["rotation"]),
+        })
+    return _serialize(doc, fmt)
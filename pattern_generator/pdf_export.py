@@ -0,0 +1,230 @@
+"""Tiled print-at-home PDF export, written page by page to a stream."""
+import zlib
+
+import numpy as np
+
+# Paper sizes in millimetres (width, height)
+PAGE_SIZES = {
+    "A4": (210.0, 297.0),
+    "Letter": (215.9, 279.4),
+}
+
+# PDF points per centimetre
+CM_TO_PT = 72 / 2.54
+
+# Gap (cm) between pieces on the printed sheet
+PIECE_SPACING = 2.0
+
+
+def _shelf_layout(patterns, sheet_width):
+    """Lay pieces out left to right in rows ("shelves") no wider than sheet_width.
+
+    Returns a list of (pattern, offset) pairs, with pieces translated so the
+    sheet starts at (0, 0) and grows upwards, and the total sheet size.
+    """
+    placed = []
+    x = y = row_height = 0.0
+    for pattern in patterns:
+        polygon = _extent_polygon(pattern)
+        lo, hi = polygon.min(axis=0), polygon.max(axis=0)
+        width, height = hi - lo
+        if x > 0 and x + width > sheet_width:
+            x, y, row_height = 0.0, y + row_height + PIECE_SPACING, 0.0
+        placed.append((pattern, np.array([x, y]) - lo))
+        x += width + PIECE_SPACING
+        row_height = max(row_height, height)
+    used_width = max((offset[0] + _extent_polygon(p).max(axis=0)[0] for p, offset in placed), default=0)
+    return placed, (used_width, y + row_height)
+
+
+def _extent_polygon(pattern):
+    """Return the outermost polygon of a piece: its cutting line, or its outline."""
+    for key in ("cutting_line", "outline", "points"):
+        if pattern.get(key) is not None:
+            return np.asarray(pattern[key], dtype=float)
+
+
+def clip_polyline(polygon, rect):
+    """Clip a closed polygon's edges to an axis-aligned rect (xmin, ymin, xmax, ymax).
+
+    Returns a list of polylines (arrays of points) covering the visible parts
+    of the outline; edges are clipped all at once with Liang-Barsky.
+    """
+    start = np.asarray(polygon, dtype=float)
+    end = np.roll(start, -1, axis=0)
+    delta = end - start
+    xmin, ymin, xmax, ymax = rect
+
+    t0 = np.zeros(len(start))
+    t1 = np.ones(len(start))
+    visible = np.ones(len(start), dtype=bool)
+    for p, q in ((-delta[:, 0], start[:, 0] - xmin), (delta[:, 0], xmax - start[:, 0]),
+                 (-delta[:, 1], start[:, 1] - ymin), (delta[:, 1], ymax - start[:, 1])):
+        parallel = p == 0
+        visible &= ~(parallel & (q < 0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = q / p
+        t0 = np.where(~parallel & (p < 0), np.maximum(t0, r), t0)
+        t1 = np.where(~parallel & (p > 0), np.minimum(t1, r), t1)
+    visible &= t0 <= t1
+
+    clipped_start = start + delta * t0[:, None]
+    clipped_end = start + delta * t1[:, None]
+
+    # Join consecutive visible edges into polylines
+    lines, current = [], None
+    for i in np.flatnonzero(visible):
+        if current is not None and np.allclose(current[-1], clipped_start[i]):
+            current.append(clipped_end[i])
+        else:
+            current = [clipped_start[i], clipped_end[i]]
+            lines.append(current)
+    if len(lines) > 1 and np.allclose(lines[-1][-1], lines[0][0]):
+        lines[0] = lines.pop() + lines[0][1:]
+    return [np.array(line) for line in lines]
+
+
+class _PDFStream:
+    """Minimal PDF writer that emits objects as soon as they are produced."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.offsets = {}
+        self.position = 0
+        self.next_id = 1
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write(self, data):
+        self.stream.write(data)
+        self.position += len(data)
+
+    def reserve(self):
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def write_object(self, object_id, body, stream_data=None):
+        self.offsets[object_id] = self.position
+        if stream_data is None:
+            self._write(f"{object_id} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+            return
+        self._write(f"{object_id} 0 obj\n{body[:-2]} /Length {len(stream_data)} >>\nstream\n".encode("latin-1"))
+        self._write(stream_data)
+        self._write(b"\nendstream\nendobj\n")
+
+    def finish(self, root_id):
+        xref = self.position
+        lines = [f"xref\n0 {self.next_id}\n", "0000000000 65535 f \n"]
+        lines += [f"{self.offsets[i]:010d} 00000 n \n" for i in range(1, self.next_id)]
+        lines.append(f"trailer\n<< /Size {self.next_id} /Root {root_id} 0 R >>\nstartxref\n{xref}\n%%EOF\n")
+        self._write("".join(lines).encode("latin-1"))
+
+
+def _fmt(value):
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def _polyline_ops(line, origin):
+    """PDF path operators stroking a polyline given in sheet centimetres."""
+    points = (line - origin) * CM_TO_PT
+    ops = [f"{_fmt(points[0][0])} {_fmt(points[0][1])} m"]
+    ops += [f"{_fmt(x)} {_fmt(y)} l" for x, y in points[1:]]
+    ops.append("S")
+    return ops
+
+
+def _registration_mark(x, y, size=5.0):
+    """Crosshair and circle centred on (x, y) in points."""
+    r = size
+    return [f"{_fmt(x - 2 * r)} {_fmt(y)} m {_fmt(x + 2 * r)} {_fmt(y)} l S",
+            f"{_fmt(x)} {_fmt(y - 2 * r)} m {_fmt(x)} {_fmt(y + 2 * r)} l S",
+            f"{_fmt(x - r)} {_fmt(y - r)} {_fmt(2 * r)} {_fmt(2 * r)} re S"]
+
+
+def write_tiled_pdf(patterns, stream, page_size="A4", margin_mm=10.0, pages_across=3):
+    """Write pattern pieces at 1:1 scale, tiled over printable pages, to a binary stream.
+
+    Pieces are laid out on a sheet pages_across pages wide. Each page holds
+    only the outline segments that fall on it (clipped geometrically), plus
+    registration marks at the tile corners and a row/column label for
+    assembly. Pages are written as they are generated, so memory stays flat
+    for sets of hundreds of pages. Returns the number of pages written.
+    """
+    page_w_mm, page_h_mm = PAGE_SIZES[page_size]
+    page_w, page_h = page_w_mm / 25.4 * 72, page_h_mm / 25.4 * 72
+    margin = margin_mm / 25.4 * 72
+    tile_w, tile_h = (page_w_mm - 2 * margin_mm) / 10, (page_h_mm - 2 * margin_mm) / 10  # cm
+
+    placed, (sheet_w, sheet_h) = _shelf_layout(patterns, pages_across * tile_w)
+    columns = max(int(np.ceil(sheet_w / tile_w)), 1)
+    rows = max(int(np.ceil(sheet_h / tile_h)), 1)
+
+    # Polygons to draw per piece (stitching then cutting line) and their boxes, in sheet coordinates
+    pieces = []
+    for pattern, offset in placed:
+        polygons = [np.asarray(pattern[key], dtype=float) + offset
+                    for key in ("outline", "cutting_line") if pattern.get(key) is not None]
+        if not polygons:
+            polygons = [np.asarray(pattern["points"], dtype=float) + offset]
+        stacked = np.vstack(polygons)
+        pieces.append((pattern, polygons, stacked.min(axis=0), stacked.max(axis=0)))
+    boxes = np.array([[*lo, *hi] for _, _, lo, hi in pieces]).reshape(-1, 4)
+
+    pdf = _PDFStream(stream)
+    catalog_id, pages_id, font_id = pdf.reserve(), pdf.reserve(), pdf.reserve()
+    pdf.write_object(font_id, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    page_ids = []
+    # Print the top row of the sheet first so pages read top to bottom
+    for row in range(rows - 1, -1, -1):
+        for column in range(columns):
+            rect = (column * tile_w, row * tile_h, (column + 1) * tile_w, (row + 1) * tile_h)
+            origin = np.array(rect[:2]) - margin / CM_TO_PT
+            ops = ["0.5 w", f"{_fmt(margin)} {_fmt(margin)} {_fmt(page_w - 2 * margin)} "
+                            f"{_fmt(page_h - 2 * margin)} re W n"]
+
+            # Only pieces whose boxes overlap this tile are clipped and drawn
+            near = ((boxes[:, 0] <= rect[2]) & (boxes[:, 2] >= rect[0]) &
+                    (boxes[:, 1] <= rect[3]) & (boxes[:, 3] >= rect[1]))
+            for index in np.flatnonzero(near):
+                pattern, polygons, lo, hi = pieces[index]
+                for k, polygon in enumerate(polygons):
+                    ops.append("[4 3] 0 d" if k else "[] 0 d")
+                    for line in clip_polyline(polygon, rect):
+                        ops.extend(_polyline_ops(line, origin))
+                label_x, label_y = lo[0], hi[1] + 0.5
+                if rect[0] <= label_x < rect[2] and rect[1] <= label_y < rect[3]:
+                    x, y = (np.array([label_x, label_y]) - origin) * CM_TO_PT
+                    ops.append(f"BT /F1 12 Tf {_fmt(x)} {_fmt(y)} Td "
+                               f"({pattern.get('title', pattern['name'])}) Tj ET")
+
+            # Registration marks and the tile label sit outside the clipped drawing area
+            ops.append("Q q [] 0 d 0.3 w")
+            for x in (margin, page_w - margin):
+                for y in (margin, page_h - margin):
+                    ops.extend(_registration_mark(x, y))
+            label = f"{chr(ord('A') + (rows - 1 - row) % 26)}{column + 1}"
+            ops.append(f"BT /F1 9 Tf {_fmt(margin + 14)} {_fmt(margin / 3)} Td "
+                       f"(Page {label} - row {rows - row} of {rows}, column {column + 1} of {columns}) Tj ET")
+            if row == rows - 1 and column == 0:
+                # 5 cm test square to check the print scale
+                size = 5 * CM_TO_PT
+                ops.append(f"{_fmt(page_w - margin - size - 10)} {_fmt(margin + 10)} "
+                           f"{_fmt(size)} {_fmt(size)} re S")
+                ops.append(f"BT /F1 8 Tf {_fmt(page_w - margin - size - 10)} {_fmt(margin + size + 14)} Td "
+                           f"(5 cm test square) Tj ET")
+
+            content = zlib.compress(("q " + "\n".join(ops) + " Q").encode("latin-1"))
+            content_id, page_id = pdf.reserve(), pdf.reserve()
+            pdf.write_object(content_id, "<< /Filter /FlateDecode >>", content)
+            pdf.write_object(page_id, f"<< /Type /Page /Parent {pages_id} 0 R "
+                                      f"/MediaBox [0 0 {_fmt(page_w)} {_fmt(page_h)}] "
+                                      f"/Resources << /Font << /F1 {font_id} 0 R >> >> "
+                                      f"/Contents {content_id} 0 R >>")
+            page_ids.append(page_id)
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    pdf.write_object(pages_id, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>")
+    pdf.write_object(catalog_id, f"<< /Type /Catalog /Pages {pages_id} 0 R >>")
+    pdf.finish(catalog_id)
+    return len(page_ids)
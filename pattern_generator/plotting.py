@@ -0,0 +1,81 @@
+"""Matplotlib rendering of pattern pieces."""
+import numpy as np
+from matplotlib.path import Path
+import matplotlib.patches as patches
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import Affine2D
+
+from .geometry import build_patterns
+from .flatten import path_outline
+from .seam_allowance import SEAM_ALLOWANCE, offset_polygon
+
+
+def _label_path(points, size):
+    """Build one compound path holding every point number, right-aligned at its point."""
+    glyphs = []
+    for i, (x, y) in enumerate(points):
+        text = TextPath((0, 0), f'{i}', size=size)
+        width = text.get_extents().width
+        glyphs.append(text.transformed(Affine2D().translate(x - width, y)))
+    return Path.make_compound_path(*glyphs)
+
+
+def plot_pattern(path, points, title, ax, cutting_line=None, labels=True):
+    """Plot a pattern piece on the given axis.
+
+    cutting_line is the seam-allowance outline; if omitted it is offset from
+    the path by SEAM_ALLOWANCE. Markers are drawn as a single scatter and
+    labels as a single patch; labels=False skips them for large nests.
+    """
+    if cutting_line is None:
+        cutting_line = offset_polygon(path_outline(path.vertices, path.codes)[0], SEAM_ALLOWANCE)
+
+    patch = patches.PathPatch(path, facecolor='none', lw=2)
+    ax.add_patch(patch)
+
+    points = np.asarray(points, dtype=float)
+    extent = np.vstack([points, cutting_line])
+    lo, hi = extent.min(axis=0), extent.max(axis=0)
+
+    # Add points and labels for key measurements
+    ax.scatter(points[:, 0], points[:, 1], s=16, color='red', zorder=3)
+    if labels:
+        # Glyphs are sized in data units, about 3% of the piece's larger dimension
+        label_size = 0.03 * max(hi - lo)
+        ax.add_patch(patches.PathPatch(_label_path(points, label_size), facecolor='black', lw=0, zorder=4))
+
+    # Set axis properties
+    ax.set_xlim(lo[0] - 5, hi[0] + 5)
+    ax.set_ylim(lo[1] - 5, hi[1] + 5)
+    ax.set_aspect('equal')
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.set_title(title)
+
+    # Add seam allowance (dashed cutting line, shaded between it and the stitching line)
+    seam_path = Path.make_compound_path(Path(np.vstack([cutting_line, cutting_line[:1]]), closed=True), path)
+    seam_patch = patches.PathPatch(seam_path, facecolor='lightgray', alpha=0.3, lw=1, ls='--')
+    ax.add_patch(seam_patch)
+
+
+def generate_all_patterns(measurements, labels=True):
+    """Generate all pattern pieces and return them as a figure for display."""
+    # pyplot is imported here so batch and worker processes never pay for it
+    import matplotlib.pyplot as plt
+
+    fig, axs = plt.subplots(2, 3, figsize=(15, 10))
+
+    # Generate and plot each pattern piece
+    patterns = build_patterns(measurements)
+    for pattern, ax in zip(patterns, axs.flat):
+        plot_pattern(pattern["path"], pattern["points"], pattern["title"], ax, pattern["cutting_line"], labels)
+
+    # Add an empty plot with pattern key
+    axs[1, 2].axis('off')
+    axs[1, 2].text(0.1, 0.9, "Pattern Key:", fontsize=12, fontweight='bold')
+    axs[1, 2].text(0.1, 0.8, "Red dots: Key points", fontsize=10)
+    axs[1, 2].text(0.1, 0.7, "Solid line: Stitching line", fontsize=10)
+    axs[1, 2].text(0.1, 0.6, "Dashed line: Cutting line", fontsize=10)
+    axs[1, 2].text(0.1, 0.5, "Gray area: seam allowance", fontsize=10)
+
+    plt.tight_layout()
+    return fig, patterns
@@ -0,0 +1,183 @@
+"""Fast PNG preview renderer working directly on NumPy vertex arrays.
+
+This bypasses matplotlib entirely: outlines, seam allowances and point
+labels are rasterized into an RGB array and encoded with zlib.
+"""
+import struct
+import zlib
+
+import numpy as np
+
+# 3x5 bitmap font for point numbers and piece titles
+FONT = {
+    "0": ("111", "101", "101", "101", "111"), "1": ("010", "110", "010", "010", "111"),
+    "2": ("111", "001", "111", "100", "111"), "3": ("111", "001", "111", "001", "111"),
+    "4": ("101", "101", "111", "001", "001"), "5": ("111", "100", "111", "001", "111"),
+    "6": ("111", "100", "111", "101", "111"), "7": ("111", "001", "010", "010", "010"),
+    "8": ("111", "101", "111", "101", "111"), "9": ("111", "101", "111", "001", "111"),
+    "A": ("010", "101", "111", "101", "101"), "B": ("110", "101", "110", "101", "110"),
+    "C": ("011", "100", "100", "100", "011"), "D": ("110", "101", "101", "101", "110"),
+    "E": ("111", "100", "110", "100", "111"), "F": ("111", "100", "110", "100", "100"),
+    "G": ("011", "100", "101", "101", "011"), "H": ("101", "101", "111", "101", "101"),
+    "I": ("111", "010", "010", "010", "111"), "J": ("001", "001", "001", "101", "010"),
+    "K": ("101", "101", "110", "101", "101"), "L": ("100", "100", "100", "100", "111"),
+    "M": ("101", "111", "111", "101", "101"), "N": ("110", "101", "101", "101", "101"),
+    "O": ("010", "101", "101", "101", "010"), "P": ("110", "101", "110", "100", "100"),
+    "Q": ("010", "101", "101", "110", "011"), "R": ("110", "101", "110", "101", "101"),
+    "S": ("011", "100", "010", "001", "110"), "T": ("111", "010", "010", "010", "010"),
+    "U": ("101", "101", "101", "101", "111"), "V": ("101", "101", "101", "101", "010"),
+    "W": ("101", "101", "111", "111", "101"), "X": ("101", "101", "010", "101", "101"),
+    "Y": ("101", "101", "010", "010", "010"), "Z": ("111", "001", "010", "100", "111"),
+    " ": ("000", "000", "000", "000", "000"),
+}
+_GLYPHS = {char: np.array([[bit == "1" for bit in row] for row in rows]) for char, rows in FONT.items()}
+
+BACKGROUND = (255, 255, 255)
+OUTLINE_COLOR = (40, 40, 40)
+SEAM_COLOR = (150, 150, 150)
+SEAM_FILL = (235, 235, 235)
+POINT_COLOR = (220, 0, 0)
+TEXT_COLOR = (0, 0, 0)
+
+
+def encode_png(image, compress_level=1):
+    """Encode an (H, W, 3) uint8 array as PNG bytes."""
+    height, width, _ = image.shape
+    # Each scanline starts with filter type 0 (none)
+    raw = np.concatenate([np.zeros((height, 1), dtype=np.uint8), image.reshape(height, -1)], axis=1)
+
+    def chunk(kind, data):
+        return (struct.pack(">I", len(data)) + kind + data +
+                struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) +
+            chunk(b"IDAT", zlib.compress(raw.tobytes(), compress_level)) + chunk(b"IEND", b""))
+
+
+def _polyline_pixels(points, closed=True, dash=None):
+    """Return integer pixel coordinates along a polyline, optionally dashed."""
+    if closed:
+        points = np.vstack([points, points[:1]])
+    starts, ends = points[:-1], points[1:]
+    lengths = np.linalg.norm(ends - starts, axis=1)
+    # Sample every half pixel along each segment
+    counts = np.maximum(np.ceil(lengths * 2).astype(int), 1)
+    segment = np.repeat(np.arange(len(starts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    t = (offsets / counts[segment])[:, None]
+    samples = starts[segment] + (ends[segment] - starts[segment]) * t
+    if dash:
+        distance = np.concatenate([[0], np.cumsum(lengths)])[segment] + lengths[segment] * t[:, 0]
+        samples = samples[(distance // dash) % 2 == 0]
+    return np.round(samples).astype(int)
+
+
+def _plot(image, pixels, color, thickness=1):
+    """Set pixels (x, y) to color, thickening them into a square brush."""
+    height, width, _ = image.shape
+    for dx in range(thickness):
+        for dy in range(thickness):
+            x, y = pixels[:, 0] + dx - thickness // 2, pixels[:, 1] + dy - thickness // 2
+            inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+            image[y[inside], x[inside]] = color
+
+
+def draw_text(image, text, x, y, color=TEXT_COLOR, scale=1):
+    """Draw text with the built-in 3x5 font, top-left corner at (x, y)."""
+    height, width, _ = image.shape
+    for char in text.upper():
+        glyph = _GLYPHS.get(char, _GLYPHS[" "])
+        if scale > 1:
+            glyph = glyph.repeat(scale, axis=0).repeat(scale, axis=1)
+        rows, cols = np.nonzero(glyph)
+        px, py = cols + x, rows + y
+        inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+        image[py[inside], px[inside]] = color
+        x += 4 * scale
+
+
+def _scanline_mask(polygon, box):
+    """Rasterize a polygon's interior (even-odd rule) into a boolean mask over box."""
+    x0, y0, x1, y1 = box
+    height, width = y1 - y0, x1 - x0
+    y = np.arange(y0, y1)[:, None] + 0.5
+    xa, ya = polygon[:, 0], polygon[:, 1]
+    xb, yb = np.roll(xa, -1), np.roll(ya, -1)
+
+    # x position where each pixel-row centre crosses each edge, inf where it does not
+    crosses = (ya > y) != (yb > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_cross = np.where(crosses, xa + (y - ya) * (xb - xa) / (yb - ya), np.inf)
+    x_cross.sort(axis=1)
+
+    # Consecutive crossing pairs bound the filled spans of each row
+    pairs = x_cross.shape[1] // 2
+    starts, ends = x_cross[:, 0:2 * pairs:2], x_cross[:, 1:2 * pairs:2]
+    valid = np.isfinite(starts) & np.isfinite(ends)
+    rows = np.broadcast_to(np.arange(height)[:, None], starts.shape)[valid]
+    first = np.clip(np.ceil(starts[valid] - x0 - 0.5), 0, width).astype(int)
+    last = np.clip(np.ceil(ends[valid] - x0 - 0.5), 0, width).astype(int)
+
+    coverage = np.zeros((height, width + 1), dtype=np.int32)
+    np.add.at(coverage, (rows, first), 1)
+    np.add.at(coverage, (rows, last), -1)
+    return np.cumsum(coverage[:, :-1], axis=1) > 0
+
+
+def _fill_between(image, box, outer, inner):
+    """Shade pixels inside outer but outside inner (the seam allowance band)."""
+    x0, y0, x1, y1 = box
+    band = _scanline_mask(outer, box) & ~_scanline_mask(inner, box)
+    image[y0:y1, x0:x1][band] = SEAM_FILL
+
+
+def render_piece(image, box, outline, points, cutting_line=None, title=None, labels=True):
+    """Draw one piece scaled to fit the pixel box (x0, y0, x1, y1)."""
+    x0, y0, x1, y1 = box
+    outline = np.asarray(outline, dtype=float)
+    points = np.asarray(points, dtype=float)
+    extent = outline if cutting_line is None else np.vstack([outline, cutting_line])
+    lo, hi = extent.min(axis=0), extent.max(axis=0)
+
+    # Fit the piece into the box with a margin, y axis pointing up as in the matplotlib preview
+    margin, title_height = 12, 16 if title else 0
+    scale = min((x1 - x0 - 2 * margin) / max(hi[0] - lo[0], 1e-9),
+                (y1 - y0 - 2 * margin - title_height) / max(hi[1] - lo[1], 1e-9))
+
+    # Centre the piece in the space left over after scaling
+    pad_x = (x1 - x0 - 2 * margin - (hi[0] - lo[0]) * scale) / 2
+    pad_y = (y1 - y0 - 2 * margin - title_height - (hi[1] - lo[1]) * scale) / 2
+
+    def to_pixels(p):
+        return np.column_stack([x0 + margin + pad_x + (p[:, 0] - lo[0]) * scale,
+                                y1 - margin - pad_y - (p[:, 1] - lo[1]) * scale])
+
+    if cutting_line is not None:
+        cutting_pixels = to_pixels(np.asarray(cutting_line, dtype=float))
+        outline_pixels = to_pixels(outline)
+        _fill_between(image, box, cutting_pixels, outline_pixels)
+        _plot(image, _polyline_pixels(cutting_pixels, dash=6), SEAM_COLOR)
+    _plot(image, _polyline_pixels(to_pixels(outline)), OUTLINE_COLOR, thickness=2)
+
+    point_pixels = np.round(to_pixels(points)).astype(int)
+    _plot(image, point_pixels, POINT_COLOR, thickness=4)
+    if labels:
+        for i, (px, py) in enumerate(point_pixels):
+            draw_text(image, str(i), px - 4 - 4 * len(str(i)), py - 7)
+    if title:
+        draw_text(image, title, x0 + margin, y0 + 4, scale=2)
+
+
+def render_patterns_png(patterns, cell_size=(300, 300), columns=3, labels=True):
+    """Render pattern dicts (see build_patterns) as a PNG grid like the matplotlib preview."""
+    rows = -(-len(patterns) // columns)
+    width, height = cell_size
+    image = np.empty((rows * height, columns * width, 3), dtype=np.uint8)
+    image[:] = BACKGROUND
+    for i, pattern in enumerate(patterns):
+        x0, y0 = (i % columns) * width, (i // columns) * height
+        render_piece(image, (x0, y0, x0 + width, y0 + height),
+                     pattern.get("outline", pattern["points"]), pattern["points"],
+                     pattern.get("cutting_line"), pattern.get("title", pattern["name"]), labels)
+    return encode_png(image)
@@ -0,0 +1,115 @@
+"""Seam allowance: offsetting the stitching line of a piece to its cutting line."""
+import numpy as np
+
+from .flatten import FLATTEN_TOLERANCE, path_outline
+from .spatial_index import _cross, signed_area
+
+# Default seam allowance in cm, used when no per-edge widths are known
+SEAM_ALLOWANCE = 1.5
+
+# Seam allowance (cm) for each path segment of a piece, in path order
+SEAM_ALLOWANCES = {
+    # Shoulder, armhole, side, side, hem, centre, neckline
+    "front_panel": [1.5, 1.0, 1.5, 1.5, 3.0, 1.5, 1.0],
+    "back_panel": [1.5, 1.0, 1.5, 1.5, 3.0, 1.5, 1.0],
+    # Right cap, right underarm, cuff edge, left underarm, left cap
+    "sleeve": [1.0, 1.5, 1.5, 1.5, 1.0],
+    "collar": [1.0, 1.0, 1.0, 1.0],
+    "cuff": [1.0, 1.0, 1.0, 1.0],
+}
+
+
+def offset_polygon(polygon, widths, join="mitre", mitre_limit=4.0, arc_tolerance=0.02):
+    """Offset a closed polygon outwards.
+
+    widths is a scalar or one width per edge (edge i runs from vertex i to
+    vertex i + 1). join selects how convex corners are filled: "mitre"
+    extends the offset edges until they meet, falling back to a bevel past
+    mitre_limit times the width; "round" adds an arc around the corner,
+    flattened to within arc_tolerance. Concave corners are always trimmed
+    to the intersection of the offset edges.
+    """
+    if join not in ("mitre", "round"):
+        raise ValueError(f"Unknown join {join!r}, expected 'mitre' or 'round'")
+    polygon = np.asarray(polygon, dtype=float)
+    widths = np.broadcast_to(np.asarray(widths, dtype=float), (len(polygon),))
+    orientation = 1.0 if signed_area(polygon) >= 0 else -1.0
+
+    # Unit direction and outward normal of every edge
+    direction = np.roll(polygon, -1, axis=0) - polygon
+    direction /= np.linalg.norm(direction, axis=1)[:, None]
+    normal = np.column_stack([direction[:, 1], -direction[:, 0]]) * orientation
+
+    # Offset edge i runs from starts[i] to ends[i]; the edge before vertex i is i - 1
+    starts = polygon + normal * widths[:, None]
+    ends = np.roll(polygon, -1, axis=0) + normal * widths[:, None]
+    prev_direction = np.roll(direction, 1, axis=0)
+    prev_ends = np.roll(ends, 1, axis=0)
+    prev_widths = np.roll(widths, 1)
+
+    # Intersection of the previous and current offset edges (the mitre point)
+    turn = _cross(prev_direction, direction)
+    parallel = np.abs(turn) < 1e-9
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = _cross(prev_ends - starts, prev_direction) / -turn
+    mitre = starts + np.where(parallel, 0, t)[:, None] * direction
+
+    convex = turn * orientation > 0
+    too_long = np.linalg.norm(mitre - polygon, axis=1) > mitre_limit * np.maximum(widths, prev_widths)
+
+    result = []
+    for i in range(len(polygon)):
+        if parallel[i]:
+            # Straight continuation: only a step if the width changes here
+            if abs(widths[i] - prev_widths[i]) > 1e-9:
+                result.extend([prev_ends[i], starts[i]])
+            else:
+                result.append(starts[i])
+        elif not convex[i]:
+            result.append(mitre[i])
+        elif join == "round":
+            result.extend(_round_join(polygon[i], prev_ends[i], starts[i], orientation, arc_tolerance))
+        elif too_long[i]:
+            result.extend([prev_ends[i], starts[i]])
+        else:
+            result.append(mitre[i])
+    return np.array(result)
+
+
+def _round_join(center, start, end, orientation, tolerance):
+    """Return the points of an arc from start to end around center."""
+    a0 = np.arctan2(*(start - center)[::-1])
+    a1 = np.arctan2(*(end - center)[::-1])
+    r0, r1 = np.linalg.norm(start - center), np.linalg.norm(end - center)
+
+    # Sweep the short way round in the polygon's direction of travel
+    sweep = (a1 - a0) % (2 * np.pi)
+    if orientation < 0:
+        sweep -= 2 * np.pi
+    radius = max(r0, r1)
+    max_step = 2 * np.arccos(max(1 - tolerance / radius, -1)) if radius > tolerance else np.pi / 2
+    steps = max(int(np.ceil(abs(sweep) / max_step)), 1)
+
+    fractions = np.linspace(0, 1, steps + 1)
+    angles = a0 + sweep * fractions
+    radii = r0 + (r1 - r0) * fractions
+    return np.column_stack([center[0] + radii * np.cos(angles), center[1] + radii * np.sin(angles)])
+
+
+def cutting_line(name, vertices, codes, join="mitre", tolerance=FLATTEN_TOLERANCE, allowances=None):
+    """Compute the stitching line and seam-allowance cutting line of a piece.
+
+    Returns (outline, cutting) as (M, 2) and (M', 2) arrays. Each path
+    segment uses the width from allowances (a mapping of piece name to one
+    width or a list of widths per segment), then SEAM_ALLOWANCES, then
+    SEAM_ALLOWANCE. Curves are flattened to within tolerance.
+    """
+    outline, edge_ids = path_outline(vertices, codes, tolerance)
+    segments = edge_ids.max() + 1
+    widths = (allowances or {}).get(name, SEAM_ALLOWANCES.get(name, SEAM_ALLOWANCE))
+    edge_widths = np.asarray(widths, dtype=float)
+    if edge_widths.ndim == 0:
+        edge_widths = np.full(segments, edge_widths)
+    elif edge_widths.shape != (segments,):
+        raise ValueError(f"Seam allowances for {name!r} need one width per segment ({segments}), got {len(edge_widths)}")
+    return outline, offset_polygon(outline, edge_widths[edge_ids], join=join)
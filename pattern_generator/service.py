@@ -0,0 +1,189 @@
+"""Asynchronous HTTP pattern service.
+
+Run with ``python -m pattern_generator.service --port 8080`` and POST a
+measurements JSON object to ``/patterns?format=zip`` (or ``svg``, ``png``).
+Geometry and export run in a process pool so the event loop only handles I/O.
+"""
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, urlsplit
+
+from .geometry import build_patterns, validate_measurements
+from .dxf_export import write_dxf_zip
+from .raster import render_patterns_png
+from .svg_export import patterns_to_svg
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 64 * 1024
+
+# Seconds a client gets to send the request head, and then the body
+READ_TIMEOUT = 10
+
+# Open connections accepted at once; further connections get an immediate 503
+MAX_CONNECTIONS = 256
+
+CONTENT_TYPES = {
+    "zip": "application/zip",
+    "svg": "image/svg+xml",
+    "png": "image/png",
+}
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 408: "Request Timeout",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+def render_output(measurements, output_format):
+    """Build the requested output bytes for validated measurements (runs in a worker process)."""
+    patterns = build_patterns(measurements)
+    if output_format == "zip":
+        buffer = io.BytesIO()
+        write_dxf_zip(patterns, buffer, compression="fast")
+        return buffer.getvalue()
+    if output_format == "svg":
+        return patterns_to_svg(patterns).encode("utf-8")
+    return render_patterns_png(patterns)
+
+
+class PatternService:
+    """HTTP front end with a bounded number of requests in flight."""
+
+    def __init__(self, workers=None, max_concurrency=32, max_connections=MAX_CONNECTIONS, read_timeout=READ_TIMEOUT):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = self._new_executor()
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.read_timeout = read_timeout
+        self.connections = asyncio.Semaphore(max_connections)
+
+    def _new_executor(self):
+        # forkserver workers do not inherit the listening or client sockets; it is
+        # not available on Windows, where spawn workers do not inherit them either
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+
+    async def handle(self, reader, writer):
+        if self.connections.locked():
+            # Refuse at once rather than letting idle clients pile up open sockets
+            status, content_type, body = 503, "application/json", _error("Too many open connections")
+        else:
+            async with self.connections:
+                try:
+                    status, content_type, body = await self._dispatch(reader)
+                except Exception:
+                    status, content_type, body = 500, "application/json", _error("Internal server error")
+        try:
+            writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: {content_type}\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, reader):
+        try:
+            method, target, headers = await asyncio.wait_for(self._read_head(reader), self.read_timeout)
+        except asyncio.TimeoutError:
+            return 408, "application/json", _error("Timed out reading the request")
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            return 400, "application/json", _error("Malformed HTTP request")
+
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, "application/json", json.dumps({"in_flight": self.in_flight}).encode()
+        if url.path != "/patterns":
+            return 404, "application/json", _error("Not found")
+        if method != "POST":
+            return 405, "application/json", _error("Use POST")
+
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            return 400, "application/json", _error("Malformed HTTP request")
+        if length > MAX_BODY_BYTES:
+            return 413, "application/json", _error("Request body too large")
+        output_format = parse_qs(url.query).get("format", ["zip"])[0]
+        if output_format not in CONTENT_TYPES:
+            return 400, "application/json", _error(f"format must be one of {', '.join(CONTENT_TYPES)}")
+        try:
+            body = await asyncio.wait_for(reader.readexactly(length), self.read_timeout)
+            measurements = validate_measurements(json.loads(body))
+        except asyncio.TimeoutError:
+            return 408, "application/json", _error("Timed out reading the request")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return 400, "application/json", _error("Malformed HTTP request")
+        except (json.JSONDecodeError, UnicodeDecodeError, ValueError) as e:
+            return 400, "application/json", _error(str(e))
+
+        # Shed load instead of queueing without bound
+        if self.in_flight >= self.max_concurrency:
+            return 503, "application/json", _error("Too many requests in flight")
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            body = await loop.run_in_executor(self.executor, render_output, measurements, output_format)
+        except BrokenProcessPool:
+            # A worker died; replace the pool so later requests are served again
+            broken, self.executor = self.executor, self._new_executor()
+            broken.shutdown(wait=False)
+            return 500, "application/json", _error("Export worker failed")
+        except Exception:
+            return 500, "application/json", _error("Internal server error")
+        finally:
+            self.in_flight -= 1
+        return 200, CONTENT_TYPES[output_format], body
+
+    async def _read_head(self, reader):
+        """Read the request line and headers, returning (method, target, headers)."""
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) != 3:
+            raise ValueError("Bad request line")
+        method, target, _ = request_line
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return method, target, headers
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def _error(message):
+    return json.dumps({"error": message}).encode("utf-8")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shirt pattern HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None, help="export worker processes (default: CPU count)")
+    parser.add_argument("--max-concurrency", type=int, default=32, help="requests in flight before returning 503")
+    parser.add_argument("--max-connections", type=int, default=MAX_CONNECTIONS,
+                        help="open connections before new ones get 503")
+    parser.add_argument("--read-timeout", type=float, default=READ_TIMEOUT,
+                        help="seconds to receive the request head, and then the body")
+    args = parser.parse_args(argv)
+
+    service = PatternService(args.workers, args.max_concurrency, args.max_connections, args.read_timeout)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
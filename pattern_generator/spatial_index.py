@@ -0,0 +1,148 @@
+"""Spatial index and vectorized polygon queries for laying out pattern pieces."""
+from collections import defaultdict
+
+import numpy as np
+
+
+def bounding_box(polygon):
+    """Return the (xmin, ymin, xmax, ymax) box of a (K, 2) polygon."""
+    xmin, ymin = polygon.min(axis=0)
+    xmax, ymax = polygon.max(axis=0)
+    return float(xmin), float(ymin), float(xmax), float(ymax)
+
+
+def _segments(polygon):
+    """Return the (K, 2, 2) closed edge list of a polygon."""
+    return np.stack([polygon, np.roll(polygon, -1, axis=0)], axis=1)
+
+
+def _cross(u, v):
+    return u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+
+
+def signed_area(polygon):
+    """Return the signed area of a (K, 2) polygon (shoelace formula, positive when counter-clockwise)."""
+    x, y = polygon[:, 0], polygon[:, 1]
+    return (np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2
+
+
+def points_in_polygon(points, polygon):
+    """Vectorized even-odd test of which points lie inside polygon."""
+    x, y = points[:, 0:1], points[:, 1:2]
+    x1, y1 = polygon[:, 0], polygon[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    crosses = (y1 > y) != (y2 > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    return np.count_nonzero(crosses & (x < x_cross), axis=1) % 2 == 1
+
+
+def polygons_intersect(a, b):
+    """Return True if two polygons overlap or touch."""
+    sa, sb = _segments(a), _segments(b)
+    p, r = sa[:, None, 0], sa[:, None, 1] - sa[:, None, 0]
+    q, s = sb[None, :, 0], sb[None, :, 1] - sb[None, :, 0]
+
+    # Segment pairs straddle each other when both orientation tests change sign
+    d1 = _cross(r, q - p)
+    d2 = _cross(r, q + s - p)
+    d3 = _cross(s, p - q)
+    d4 = _cross(s, p + r - q)
+    if np.any((d1 * d2 <= 0) & (d3 * d4 <= 0) & ~((d1 == 0) & (d2 == 0))):
+        return True
+
+    # No edge crossings: overlap only if one polygon lies inside the other
+    return bool(points_in_polygon(a[:1], b)[0] or points_in_polygon(b[:1], a)[0])
+
+
+def _point_segment_distances(points, segments):
+    """Return the (N, M) distances from N points to M segments."""
+    start = segments[None, :, 0]
+    direction = segments[None, :, 1] - start
+    length_sq = np.einsum("...i,...i", direction, direction)
+    offset = points[:, None] - start
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(length_sq > 0, np.einsum("...i,...i", offset, direction) / length_sq, 0)
+    closest = start + np.clip(t, 0, 1)[..., None] * direction
+    return np.linalg.norm(points[:, None] - closest, axis=-1)
+
+
+def polygon_distance(a, b):
+    """Return the minimum distance between two polygons (0 if they overlap)."""
+    if polygons_intersect(a, b):
+        return 0.0
+    return float(min(_point_segment_distances(a, _segments(b)).min(),
+                     _point_segment_distances(b, _segments(a)).min()))
+
+
+class GridIndex:
+    """Uniform grid over polygon bounding boxes.
+
+    Each polygon is registered in every cell its box covers, so a query only
+    tests the few polygons near it instead of every polygon in the layout.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+        self._cells = defaultdict(list)
+        self._polygons = []
+        # Grown geometrically; only the first len(self) rows are used
+        self._boxes = np.empty((16, 4))
+
+    def __len__(self):
+        return len(self._polygons)
+
+    def _cell_range(self, box):
+        i0, j0 = int(np.floor(box[0] / self.cell_size)), int(np.floor(box[1] / self.cell_size))
+        i1, j1 = int(np.floor(box[2] / self.cell_size)), int(np.floor(box[3] / self.cell_size))
+        return ((i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1))
+
+    def insert(self, polygon):
+        """Add a polygon and return its integer id."""
+        polygon = np.asarray(polygon, dtype=float)
+        item_id = len(self._polygons)
+        box = bounding_box(polygon)
+        if item_id == len(self._boxes):
+            self._boxes = np.concatenate([self._boxes, np.empty_like(self._boxes)])
+        self._boxes[item_id] = box
+        self._polygons.append(polygon)
+        for cell in self._cell_range(box):
+            self._cells[cell].append(item_id)
+        return item_id
+
+    def polygon(self, item_id):
+        return self._polygons[item_id]
+
+    def candidates(self, box, spacing=0.0):
+        """Return ids of polygons whose boxes come within spacing of box."""
+        grown = (box[0] - spacing, box[1] - spacing, box[2] + spacing, box[3] + spacing)
+        ids = {item_id for cell in self._cell_range(grown) for item_id in self._cells.get(cell, ())}
+        if not ids:
+            return []
+        ids = np.fromiter(ids, dtype=int)
+        boxes = self._boxes[ids]
+        near = ((boxes[:, 0] < grown[2]) & (boxes[:, 2] > grown[0]) &
+                (boxes[:, 1] < grown[3]) & (boxes[:, 3] > grown[1]))
+        return sorted(ids[near].tolist())
+
+    def collides(self, polygon, spacing=0.0):
+        """Return True if polygon overlaps, or is closer than spacing to, any indexed polygon."""
+        polygon = np.asarray(polygon, dtype=float)
+        for item_id in self.candidates(bounding_box(polygon), spacing):
+            other = self._polygons[item_id]
+            if spacing > 0:
+                if polygon_distance(polygon, other) < spacing - 1e-9:
+                    return True
+            elif polygons_intersect(polygon, other):
+                return True
+        return False
+
+    def nearest(self, polygon, max_distance):
+        """Return (id, distance) of the closest polygon within max_distance, or None."""
+        polygon = np.asarray(polygon, dtype=float)
+        best = None
+        for item_id in self.candidates(bounding_box(polygon), max_distance):
+            distance = polygon_distance(polygon, self._polygons[item_id])
+            if distance <= max_distance and (best is None or distance < best[1]):
+                best = (item_id, distance)
+        return best
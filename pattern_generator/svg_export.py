@@ -0,0 +1,106 @@
+"""SVG export of pattern pieces, written with plain string building."""
+import numpy as np
+from matplotlib.path import Path
+
+# Gap (cm) between pieces laid out in the SVG grid
+SVG_SPACING = 10
+
+
+def _number(value, precision):
+    """Format a coordinate compactly: fixed precision without trailing zeros."""
+    text = f"{value:.{precision}f}".rstrip("0").rstrip(".")
+    return "0" if text in ("-0", "") else text
+
+
+def _pair(x, y, precision):
+    # SVG y grows downwards, so flip it to keep pieces the right way up
+    return f"{_number(x, precision)} {_number(-y, precision)}"
+
+
+def path_data(vertices, codes, precision=2):
+    """Return SVG path data for a matplotlib-style closed path, keeping curves as Q/C commands."""
+    commands = []
+    i = 0
+    while i < len(codes):
+        code = codes[i]
+        if code == Path.MOVETO:
+            commands.append("M" + _pair(*vertices[i], precision))
+            i += 1
+        elif code == Path.LINETO:
+            commands.append("L" + _pair(*vertices[i], precision))
+            i += 1
+        elif code == Path.CURVE3:
+            commands.append("Q" + " ".join(_pair(*v, precision) for v in vertices[i:i + 2]))
+            i += 2
+        elif code == Path.CURVE4:
+            commands.append("C" + " ".join(_pair(*v, precision) for v in vertices[i:i + 3]))
+            i += 3
+        elif code == Path.CLOSEPOLY:
+            i += 1
+        else:
+            raise ValueError(f"Unsupported path code {code}")
+    return "".join(commands) + "Z"
+
+
+def polygon_data(polygon, precision=2):
+    """Return SVG path data for a closed polygon."""
+    pairs = [_pair(x, y, precision) for x, y in polygon]
+    return "M" + pairs[0] + "L" + " ".join(pairs[1:]) + "Z"
+
+
+def patterns_to_svg(patterns, columns=3, precision=2, labels=True):
+    """Render pattern dicts (see build_patterns) as one SVG document in centimetres.
+
+    Pieces are laid out in a grid of the given number of columns. Each piece
+    is a group with its stitching line, dashed cutting line, key points and
+    labels.
+    """
+    parts = []
+    cells = []
+    for pattern in patterns:
+        extent = np.asarray(pattern["points"], dtype=float)
+        if pattern.get("cutting_line") is not None:
+            extent = np.vstack([extent, pattern["cutting_line"]])
+        cells.append((extent.min(axis=0), extent.max(axis=0)))
+
+    # Each grid row is as tall as its tallest piece, each column as wide as its widest
+    rows = -(-len(patterns) // columns)
+    col_widths = [max((hi[0] - lo[0] for k, (lo, hi) in enumerate(cells) if k % columns == c), default=0)
+                  for c in range(columns)]
+    row_heights = [max(hi[1] - lo[1] for lo, hi in cells[r * columns:(r + 1) * columns]) for r in range(rows)]
+    col_x = np.concatenate([[0], np.cumsum(np.add(col_widths, SVG_SPACING))])
+    row_y = np.concatenate([[0], np.cumsum(np.add(row_heights, SVG_SPACING))])
+    width, height = col_x[-1], row_y[-1]
+
+    for k, pattern in enumerate(patterns):
+        lo, hi = cells[k]
+        # Place the piece's top-left corner (min x, max y) at the cell origin
+        dx = col_x[k % columns] + SVG_SPACING / 2 - lo[0]
+        dy = row_y[k // columns] + SVG_SPACING / 2 + hi[1]
+        parts.append(f'<g id="{pattern["name"]}" transform="translate({_number(dx, precision)} '
+                     f'{_number(dy, precision)})">')
+        if pattern.get("title"):
+            parts.append(f'<text x="{_number(lo[0], precision)}" y="{_number(-hi[1] - 1, precision)}" '
+                         f'font-size="2.5">{pattern["title"]}</text>')
+        if pattern.get("cutting_line") is not None:
+            parts.append(f'<path class="cut" d="{polygon_data(pattern["cutting_line"], precision)}"/>')
+        path = pattern.get("path")
+        if path is not None:
+            stitch = path_data(path.vertices, path.codes, precision)
+        else:
+            stitch = polygon_data(pattern["points"], precision)
+        parts.append(f'<path class="stitch" d="{stitch}"/>')
+        for i, (x, y) in enumerate(pattern["points"]):
+            parts.append(f'<circle cx="{_number(x, precision)}" cy="{_number(-y, precision)}" r="0.5"/>')
+            if labels:
+                parts.append(f'<text x="{_number(x - 0.6, precision)}" y="{_number(-y, precision)}" '
+                             f'font-size="1.5" text-anchor="end">{i}</text>')
+        parts.append('</g>')
+
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{_number(width, 1)}cm" '
+            f'height="{_number(height, 1)}cm" viewBox="0 0 {_number(width, precision)} '
+            f'{_number(height, precision)}">'
+            '<style>path{fill:none}.stitch{stroke:#222;stroke-width:.3}'
+            '.cut{stroke:#888;stroke-width:.2;stroke-dasharray:1 .6;fill:#eee}'
+            'circle{fill:red}text{font-family:sans-serif}</style>'
+            + "".join(parts) + '</svg>')
@@ -0,0 +1,153 @@
+"""Tests for the fast DXF writer, flattening and offset bounds, and the job queue.
+
+Run from the repository root: python -m unittest
+"""
+import io
+import os
+import tempfile
+import time
+import unittest
+import zipfile
+from unittest import mock
+
+import ezdxf
+import numpy as np
+
+from pattern_generator import DXF_WRITERS, build_patterns, sample_measurements, write_dxf
+from pattern_generator import jobs
+from pattern_generator.dxf_export import _export_job
+from pattern_generator.flatten import FLATTEN_TOLERANCE, bezier_points, flatten_cubics
+from pattern_generator.jobs import STALE_AFTER, JobQueue
+from pattern_generator.seam_allowance import offset_polygon
+
+
+def _entities(text):
+    """Return a comparable summary of every modelspace entity in DXF text."""
+    doc = ezdxf.read(io.StringIO(text))
+    summary = []
+    for entity in doc.modelspace():
+        item = [entity.dxftype(), entity.dxf.layer, entity.dxf.color]
+        if entity.dxftype() == "LWPOLYLINE":
+            item += [entity.closed, np.asarray(entity.get_points("xyb"))]
+        elif entity.dxftype() == "CIRCLE":
+            item += [np.asarray(entity.dxf.center), entity.dxf.radius]
+        elif entity.dxftype() == "TEXT":
+            item += [entity.dxf.text, np.asarray(entity.dxf.insert), entity.dxf.height]
+        summary.append(item)
+    return summary
+
+
+def _distance_to_segments(points, polyline):
+    """Distance from each point to the nearest segment of a (K, 2) polyline."""
+    a, b = polyline[:-1], polyline[1:]
+    d = b - a
+    length2 = np.einsum("ij,ij->i", d, d)
+    s = np.clip(np.einsum("pkj,kj->pk", points[:, None] - a, d) / np.where(length2 > 0, length2, 1), 0, 1)
+    return np.linalg.norm(points[:, None] - (a + s[..., None] * d), axis=-1).min(axis=1)
+
+
+def _closed(polygon):
+    return np.vstack([polygon, polygon[:1]])
+
+
+class FastWriterRoundTripTest(unittest.TestCase):
+    def test_fast_writer_matches_ezdxf(self):
+        for pattern in build_patterns(sample_measurements):
+            for curves in ("polyline", "bulge"):
+                for add_seam_allowance in (True, False):
+                    with self.subTest(piece=pattern["name"], curves=curves, seam_allowance=add_seam_allowance):
+                        outputs = []
+                        for writer in DXF_WRITERS:
+                            points, filename, options = _export_job(pattern, add_seam_allowance, curves, writer)
+                            stream = io.StringIO()
+                            write_dxf(points, filename, stream, **options)
+                            outputs.append(_entities(stream.getvalue()))
+                        expected, actual = outputs
+                        self.assertEqual(len(actual), len(expected))
+                        for a, b in zip(expected, actual):
+                            self.assertEqual(b[:3], a[:3])
+                            for x, y in zip(a[3:], b[3:]):
+                                if isinstance(x, np.ndarray):
+                                    np.testing.assert_allclose(y, x, rtol=0, atol=1e-9)
+                                else:
+                                    self.assertEqual(y, x)
+
+
+class ToleranceBoundsTest(unittest.TestCase):
+    def test_flattened_curves_stay_within_tolerance(self):
+        curves = np.random.default_rng(0).uniform(-20, 20, (300, 4, 2))
+        t = np.linspace(0, 1, 400)
+        for tolerance in (FLATTEN_TOLERANCE, 0.1):
+            for curve, vertices in zip(curves, flatten_cubics(curves, tolerance)):
+                polyline = np.vstack([vertices, curve[3]])
+                error = _distance_to_segments(bezier_points(curve, t), polyline).max()
+                self.assertLessEqual(error, tolerance)
+
+    def test_smaller_tolerance_gives_more_vertices(self):
+        curves = np.random.default_rng(1).uniform(-20, 20, (50, 4, 2))
+        coarse = sum(len(v) for v in flatten_cubics(curves, 0.1))
+        fine = sum(len(v) for v in flatten_cubics(curves, 0.001))
+        self.assertGreater(fine, coarse)
+
+    def test_mitre_offset_moves_each_edge_by_its_width(self):
+        square = np.array([[0, 0], [10, 0], [10, 10], [0, 10]], dtype=float)
+        result = offset_polygon(square, [1, 2, 3, 4])
+        np.testing.assert_allclose(result.min(axis=0), [-4, -1])
+        np.testing.assert_allclose(result.max(axis=0), [12, 13])
+
+    def test_round_offset_stays_within_arc_tolerance(self):
+        angles = np.linspace(0, 2 * np.pi, 6, endpoint=False)
+        hexagon = 10 * np.column_stack([np.cos(angles), np.sin(angles)])
+        width, arc_tolerance = 1.5, 0.02
+        result = offset_polygon(hexagon, width, join="round", arc_tolerance=arc_tolerance)
+        # Vertices lie on the offset; chord midpoints dip inside it by at most the tolerance
+        np.testing.assert_allclose(_distance_to_segments(result, _closed(hexagon)), width, atol=1e-9)
+        midpoints = (result + np.roll(result, -1, axis=0)) / 2
+        self.assertGreaterEqual(_distance_to_segments(midpoints, _closed(hexagon)).min(), width - arc_tolerance)
+
+
+class JobQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.tmp.name, "out")
+        self.queue = JobQueue(os.path.join(self.tmp.name, "queue.db"))
+
+    def tearDown(self):
+        self.queue.connection.close()
+        self.tmp.cleanup()
+
+    def _heartbeat(self, job_id):
+        return self.queue.connection.execute("SELECT heartbeat FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+
+    def test_unsafe_order_ids_are_rejected(self):
+        for order_id in ("", ".", "..", "../escape", "a/b", "a\\b", os.path.abspath("abs")):
+            with self.subTest(order_id=order_id):
+                with self.assertRaises(ValueError):
+                    self.queue.submit([(order_id, sample_measurements)], self.output_dir)
+        self.assertIsNone(self.queue.claim())
+
+    def test_unknown_job_raises(self):
+        with self.assertRaises(ValueError):
+            self.queue.progress(99)
+
+    def test_stale_running_job_is_reclaimed(self):
+        job_id = self.queue.submit([("A1", sample_measurements)], self.output_dir)
+        self.assertEqual(self.queue.claim(), job_id)
+        self.assertIsNone(self.queue.claim())
+        self.queue.connection.execute("UPDATE jobs SET heartbeat = ? WHERE id = ?",
+                                      (time.time() - STALE_AFTER - 1, job_id))
+        self.assertEqual(self.queue.claim(), job_id)
+
+    def test_packaging_refreshes_heartbeat(self):
+        job_id = self.queue.submit([("A1", sample_measurements)], self.output_dir)
+        self.queue.run_job(self.queue.claim())
+        self.queue.connection.execute("UPDATE jobs SET heartbeat = 0 WHERE id = ?", (job_id,))
+        with mock.patch.object(jobs, "PACKAGE_HEARTBEAT", 0):
+            self.queue._package(job_id, self.output_dir, os.path.join(self.output_dir, "pieces"))
+        self.assertGreater(self._heartbeat(job_id), time.time() - STALE_AFTER)
+        with zipfile.ZipFile(os.path.join(self.output_dir, f"job_{job_id}.zip")) as archive:
+            self.assertEqual(len(archive.namelist()), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()